@@ -166,16 +166,11 @@ def _get_ctx() -> GraphRuntimeContext:
         return GraphRuntimeContext()
 
 
-class SafetyResourceDecision(BaseModel):
-    title: str
-    url: str
-
-
 class SafetyDecision(BaseModel):
     action: Literal["continue", "stop"]
     risk_level: Literal["normal", "crisis", "jailbreak", "medical", "out_of_scope"]
     coach_message: str
-    resources: list[SafetyResourceDecision]
+    resources: list[Resource]
 
 
 class RouteDecision(BaseModel):
@@ -809,7 +804,7 @@ def _safety_node(state: AgentState) -> AgentState:
                 "route": "FINAL",
                 "response_json": ChatResponse(
                     coach_message=decision.coach_message,
-                    resources=[Resource(**item.model_dump()) for item in decision.resources],
+                    resources=list(decision.resources),
                     risk_level=decision.risk_level,
                 ).model_dump(),
             }
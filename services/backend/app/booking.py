@@ -1,12 +1,13 @@
 from __future__ import annotations
 
-import json
 import re
+import time
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Any
 from zoneinfo import ZoneInfo
 
+import orjson
 from sqlalchemy import desc, select
 from sqlalchemy.orm import Session
 
@@ -16,6 +17,7 @@ from .models import PendingAction, User
 BOOKING_ACTION_TYPE = "booking_email"
 BOOKING_TTL_MINUTES = 15
 STOCKHOLM_TZ = ZoneInfo("Europe/Stockholm")
+UTC = ZoneInfo("UTC")
 
 EMAIL_RE = re.compile(r"([A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,})")
 ISO_DATETIME_RE = re.compile(
@@ -32,6 +34,7 @@ NAME_RE = re.compile(
     r"\b(?:my name is|i am|i'm)\s+([a-z][a-z\s.'-]{1,60})\b",
     re.IGNORECASE,
 )
+NON_ALPHA_RE = re.compile(r"[^a-z]+")
 WEEKDAY_RE = re.compile(
     r"\b(mon(?:day)?|tue(?:s|sday)?|wed(?:nesday)?|thu(?:rs|rsday)?|fri(?:day)?|sat(?:urday)?|sun(?:day)?)\b",
     re.IGNORECASE,
@@ -94,14 +97,16 @@ def is_booking_intent(message: str) -> bool:
     return has_email_address or has_datetime_hint
 
 
+def _word_tokens(message: str) -> frozenset[str]:
+    return frozenset(NON_ALPHA_RE.sub(" ", message.lower()).split())
+
+
 def is_affirmative(message: str) -> bool:
-    normalized = re.sub(r"[^a-z]+", " ", message.lower()).strip().split()
-    return any(token in {"yes", "send", "confirm"} for token in normalized)
+    return not _word_tokens(message).isdisjoint({"yes", "send", "confirm"})
 
 
 def is_negative(message: str) -> bool:
-    normalized = re.sub(r"[^a-z]+", " ", message.lower()).strip().split()
-    return any(token in {"no", "cancel", "stop"} for token in normalized)
+    return not _word_tokens(message).isdisjoint({"no", "cancel", "stop"})
 
 
 def extract_email(message: str) -> str | None:
@@ -335,7 +340,7 @@ def load_pending_booking(
     user_id: str,
     now: datetime | None = None
 ) -> tuple[PendingAction | None, bool]:
-    now_utc = now.astimezone(ZoneInfo("UTC")) if now else datetime.now(ZoneInfo("UTC"))
+    now_epoch = now.timestamp() if now else time.time()
     pending = db.execute(
         select(PendingAction)
         .where(
@@ -343,12 +348,15 @@ def load_pending_booking(
             PendingAction.action_type == BOOKING_ACTION_TYPE
         )
         .order_by(desc(PendingAction.created_at))
-    ).scalar_one_or_none()
+        .limit(1)
+    ).scalars().first()
     if not pending:
         return None, False
+    # Compare as epoch seconds: SQLite hands back naive UTC datetimes, and
+    # time.time() avoids building an aware "now" on every confirmation.
     expires_at = pending.expires_at
-    expires_utc = expires_at.astimezone(ZoneInfo("UTC")) if expires_at.tzinfo else expires_at.replace(tzinfo=ZoneInfo("UTC"))
-    if expires_utc <= now_utc:
+    expires_epoch = (expires_at if expires_at.tzinfo else expires_at.replace(tzinfo=UTC)).timestamp()
+    if expires_epoch <= now_epoch:
         db.delete(pending)
         db.commit()
         return None, True
@@ -361,7 +369,7 @@ def save_pending_booking(
     payload: dict[str, Any],
     now: datetime | None = None
 ) -> PendingAction:
-    now_utc = now.astimezone(ZoneInfo("UTC")) if now else datetime.now(ZoneInfo("UTC"))
+    now_utc = now.astimezone(UTC) if now else datetime.now(UTC)
     expires_at = now_utc + timedelta(minutes=BOOKING_TTL_MINUTES)
     existing = db.execute(
         select(PendingAction).where(
@@ -374,7 +382,7 @@ def save_pending_booking(
     pending = PendingAction(
         user_id=user_id,
         action_type=BOOKING_ACTION_TYPE,
-        payload_json=json.dumps(payload),
+        payload_json=orjson.dumps(payload).decode(),
         expires_at=expires_at
     )
     db.add(pending)
@@ -390,7 +398,7 @@ def clear_pending_booking(db: Session, pending: PendingAction) -> None:
 
 def parse_pending_payload(pending: PendingAction) -> dict[str, Any]:
     try:
-        payload = json.loads(pending.payload_json)
+        payload = orjson.loads(pending.payload_json)
     except (ValueError, TypeError):
         return {}
     if not isinstance(payload, dict):
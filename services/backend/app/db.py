@@ -2,6 +2,7 @@ from typing import Any, Callable, Iterable
 
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
+from sqlalchemy.pool import StaticPool
 
 from .config import settings
 from .embed_dimension import get_active_embedding_dim
@@ -17,14 +18,31 @@ def _make_engine(database_url: str):
         database_url = "postgresql+psycopg://" + database_url[len("postgresql://"):]
     if database_url.startswith("postgres://"):
         database_url = "postgresql+psycopg://" + database_url[len("postgres://"):]
+    if database_url.startswith("sqlite") and (":memory:" in database_url or "mode=memory" in database_url):
+        # An in-memory SQLite database lives only as long as its connection, so
+        # every thread must share one connection rather than pool several.
+        return create_engine(
+            database_url,
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
     return create_engine(database_url, pool_pre_ping=True)
 
 
 engine = _make_engine(settings.database_url)
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+# Embedding dimension already checked against chunks.embedding for the current
+# engine; lets retrieval skip the pg_attribute probe on every request.
+_verified_embedding_dim: int | None = None
+# Set once init_db has built the schema on the current engine; the persistence
+# helpers call init_db before every operation and the DDL is idempotent.
+_schema_ready = False
 
 
 def init_db() -> None:
+    global _schema_ready
+    if _schema_ready:
+        return
     from . import models
 
     if engine.dialect.name == "sqlite":
@@ -82,15 +100,9 @@ def init_db() -> None:
                     """
                 )
             )
-            conn.execute(
-                text(
-                    """
-                    -- Dimension may change as embeddings evolve.
-                    CREATE INDEX IF NOT EXISTS chunks_embedding_ivfflat_idx
-                    ON chunks USING ivfflat (embedding) WITH (lists = 100);
-                    """
-                )
-            )
+            # The ANN index is not built here: on a populated table it is slow,
+            # and it must match the stored dimension. Apply
+            # sql/create_chunks_halfvec_index.sql once instead.
             conn.execute(
                 text(
                     """
@@ -206,11 +218,14 @@ def init_db() -> None:
             )
 
     Base.metadata.create_all(bind=engine)
+    _schema_ready = True
 
 
 def reset_engine(database_url: str | None = None) -> None:
-    global engine, SessionLocal
+    global engine, SessionLocal, _verified_embedding_dim, _schema_ready
     engine.dispose()
+    _verified_embedding_dim = None
+    _schema_ready = False
     engine = _make_engine(database_url or settings.database_url)
     SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 
@@ -241,7 +256,7 @@ def pgvector_ready() -> bool:
         return False
 
 
-def _vector_literal(values: Iterable[float]) -> str:
+def vector_literal(values: Iterable[float]) -> str:
     return "[" + ",".join(f"{value:.6f}" for value in values) + "]"
 
 
@@ -274,9 +289,12 @@ def get_chunks_embedding_dim() -> int | None:
 
 
 def ensure_embedding_dimension_compatible() -> int | None:
+    global _verified_embedding_dim
     if engine.dialect.name != "postgresql":
         return None
     active_dim = get_active_embedding_dim()
+    if _verified_embedding_dim == active_dim:
+        return active_dim
     schema_typmod = get_chunks_embedding_dim()
     if schema_typmod is None:
         return None
@@ -287,6 +305,7 @@ def ensure_embedding_dimension_compatible() -> int | None:
             f"vector({schema_dim}) but active embed dimension is {active_dim}. "
             "Apply the vector dimension migration and run reindex."
         )
+    _verified_embedding_dim = active_dim
     return active_dim
 
 
@@ -305,18 +324,18 @@ def retrieve_similar_chunks(
             f"Query embedding dimension {len(query_embedding)} does not match active "
             f"embed dimension {active_dim}. Reindex using the active embed provider/model."
         )
-    vector_literal = _vector_literal(query_embedding)
+    embedding_literal = vector_literal(query_embedding)
     with engine.connect() as conn:
         rows = conn.execute(
             text(
-                """
+                f"""
                 SELECT text, metadata
                 FROM chunks
-                ORDER BY embedding <=> (:embedding)::vector
+                ORDER BY embedding::halfvec({active_dim}) <=> (:embedding)::halfvec({active_dim})
                 LIMIT :limit;
                 """
             ),
-            {"embedding": vector_literal, "limit": top_k}
+            {"embedding": embedding_literal, "limit": top_k}
         ).fetchall()
     return [{"text": row[0], "metadata": row[1]} for row in rows]
 
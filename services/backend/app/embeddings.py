@@ -15,3 +15,19 @@ def get_embedding(text: str) -> List[float]:
     if not vectors:
         raise RuntimeError("Embedding provider returned no vectors.")
     return vectors[0]
+
+
+def get_embeddings(texts: List[str]) -> List[List[float]]:
+    if not texts:
+        return []
+    try:
+        vectors = embed_texts(texts)
+    except ProviderNotConfiguredError:
+        raise
+    except ProviderError as exc:
+        raise RuntimeError(str(exc)) from exc
+    if len(vectors) != len(texts):
+        raise RuntimeError(
+            f"Embedding provider returned {len(vectors)} vectors for {len(texts)} texts."
+        )
+    return vectors
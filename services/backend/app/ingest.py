@@ -28,10 +28,6 @@ def chunk_text(text_value: str, chunk_size: int = 1500, overlap: int = 200) -> L
     return chunks
 
 
-def _vector_literal(values: List[float]) -> str:
-    return "[" + ",".join(f"{value:.6f}" for value in values) + "]"
-
-
 def _read_pdf(path: Path) -> str:
     reader = PdfReader(str(path))
     parts = []
@@ -92,6 +88,8 @@ def ingest_paths(
                 }
             )
             document_id = result.scalar_one()
+            metadata = json.dumps({"source_id": source_id})
+            rows = []
             for index, chunk in enumerate(chunks):
                 embedding = embed_fn(chunk)
                 if len(embedding) != active_dim:
@@ -99,24 +97,27 @@ def ingest_paths(
                         f"Embedding dimension {len(embedding)} does not match active "
                         f"dimension {active_dim}. Update provider config and reindex."
                     )
-                metadata = json.dumps({"source_id": source_id})
-                conn.execute(
-                    text(
-                        """
-                        INSERT INTO chunks (document_id, chunk_index, text, metadata, embedding)
-                        VALUES (:document_id, :chunk_index, :text, (:metadata)::jsonb, (:embedding)::vector)
-                        ON CONFLICT (document_id, chunk_index) DO NOTHING;
-                        """
-                    ),
+                rows.append(
                     {
                         "document_id": document_id,
                         "chunk_index": index,
                         "text": chunk,
                         "metadata": metadata,
-                        "embedding": _vector_literal(embedding)
+                        "embedding": db.vector_literal(embedding)
                     }
                 )
-                inserted_chunks += 1
+            # One executemany per document instead of one INSERT round trip per chunk.
+            conn.execute(
+                text(
+                    """
+                    INSERT INTO chunks (document_id, chunk_index, text, metadata, embedding)
+                    VALUES (:document_id, :chunk_index, :text, (:metadata)::jsonb, (:embedding)::vector)
+                    ON CONFLICT (document_id, chunk_index) DO NOTHING;
+                    """
+                ),
+                rows
+            )
+            inserted_chunks += len(rows)
     return inserted_chunks
 
 
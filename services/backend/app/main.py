@@ -3,9 +3,12 @@ import hashlib
 import json
 import re
 import secrets
+import threading
+import time
 import urllib.parse
 from contextlib import asynccontextmanager
 from datetime import datetime
+from functools import lru_cache
 from typing import Any, AsyncIterator
 from uuid import UUID
 from zoneinfo import ZoneInfo
@@ -16,10 +19,12 @@ from .security.rate_limiter import RateLimiter, RateLimitExceeded
 from .runtime_requirements import ensure_backend_requirements
 
 import httpx
+import orjson
+import requests
 import stripe
 from fastapi import Depends, FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, RedirectResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, RedirectResponse
 from google.auth.transport.requests import Request as GoogleRequest
 from google.oauth2 import id_token as google_id_token
 from sqlalchemy import select
@@ -111,7 +116,7 @@ logger = get_logger(__name__)
 UTC = ZoneInfo("UTC")
 
 # ---------------------------------------------------------------------------
-# Rate limiter — shared across requests (in-process, thread-safe)
+# Rate limiter — fixed-window counters in the database, shared by all workers
 # ---------------------------------------------------------------------------
 _rate_limiter = RateLimiter(
     max_requests=settings.rate_limit_chat_requests,
@@ -414,6 +419,11 @@ def _code_challenge(code_verifier: str) -> str:
     return base64.urlsafe_b64encode(digest).decode("ascii").rstrip("=")
 
 
+# One pooled client for the token endpoint so repeated OAuth callbacks reuse the
+# keep-alive TLS connection to Google instead of handshaking on every exchange.
+_GOOGLE_TOKEN_CLIENT = httpx.Client(timeout=10.0)
+
+
 def _exchange_code_for_tokens(code: str, code_verifier: str) -> tuple[dict[str, Any], int]:
     data = {
         "code": code,
@@ -424,7 +434,7 @@ def _exchange_code_for_tokens(code: str, code_verifier: str) -> tuple[dict[str,
         "code_verifier": code_verifier
     }
     try:
-        response = httpx.post(GOOGLE_TOKEN_URL, data=data, timeout=10.0)
+        response = _GOOGLE_TOKEN_CLIENT.post(GOOGLE_TOKEN_URL, data=data)
         response.raise_for_status()
     except httpx.HTTPError as exc:
         raise HTTPException(status_code=502, detail="google token exchange failed") from exc
@@ -432,19 +442,25 @@ def _exchange_code_for_tokens(code: str, code_verifier: str) -> tuple[dict[str,
     return response.json(), response.status_code
 
 
+@lru_cache(maxsize=1024)
+def _decode_jwt_segment(segment: str) -> Any:
+    # Unverified decode of one base64url JWT segment, cached per segment so a
+    # token that is logged more than once is only decoded once.  Callers must
+    # not mutate the returned object.
+    padding = "=" * (-len(segment) % 4)
+    try:
+        return orjson.loads(base64.urlsafe_b64decode(segment + padding))
+    except ValueError as exc:
+        logger.debug("JWT payload decode failed: %s", exc)
+        return None
+
+
 def _decode_jwt_claims(token: str) -> dict[str, Any]:
     claims = {"iss": None, "aud": None, "exp": None, "iat": None}
     parts = token.split(".")
     if len(parts) < 2:
         return claims
-    payload_b64 = parts[1]
-    padding = "=" * (-len(payload_b64) % 4)
-    try:
-        payload_bytes = base64.urlsafe_b64decode(payload_b64 + padding)
-        payload = json.loads(payload_bytes.decode("utf-8"))
-    except (ValueError, json.JSONDecodeError) as exc:
-        logger.debug("JWT payload decode failed: %s", exc)
-        return claims
+    payload = _decode_jwt_segment(parts[1])
     if isinstance(payload, dict):
         for key in claims:
             if key in payload:
@@ -452,11 +468,46 @@ def _decode_jwt_claims(token: str) -> dict[str, Any]:
     return claims
 
 
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+class _CachingGoogleRequest(GoogleRequest):
+    """google-auth transport that honours Cache-Control on GET responses.
+
+    google-auth refetches Google's signing certs for every id_token it
+    verifies. The certs rotate on a published max-age, so keeping the response
+    until then turns each OAuth callback's extra HTTPS round trip into a dict
+    lookup; the underlying requests.Session also keeps the connection alive.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(session=requests.Session())
+        self._cache: dict[str, tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, url, method="GET", body=None, headers=None, timeout=120, **kwargs):
+        if method != "GET" or body is not None:
+            return super().__call__(url, method=method, body=body, headers=headers, timeout=timeout, **kwargs)
+        with self._lock:
+            cached = self._cache.get(url)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+        response = super().__call__(url, method=method, headers=headers, timeout=timeout, **kwargs)
+        match = _MAX_AGE_RE.search(response.headers.get("cache-control", ""))
+        if response.status == 200 and match:
+            with self._lock:
+                self._cache[url] = (time.monotonic() + int(match.group(1)), response)
+        return response
+
+
+_GOOGLE_CERT_REQUEST = _CachingGoogleRequest()
+
+
 def _verify_id_token(id_token: str, token_keys: list[str]) -> dict[str, Any]:
     try:
         claims = google_id_token.verify_oauth2_token(
             id_token,
-            GoogleRequest(),
+            _GOOGLE_CERT_REQUEST,
             settings.google_client_id,
             clock_skew_in_seconds=10,
         )
@@ -535,7 +586,7 @@ def auth_google_callback(request: Request, db: Session = Depends(get_db)) -> Res
             db.add(user)
             db.commit()
             db.refresh(user)
-        response = JSONResponse(content={"status": "stubbed"})
+        response = ORJSONResponse(content={"status": "stubbed"})
         _set_cookie(response, settings.session_cookie_name, str(user.id), request=request)
         return response
 
@@ -703,13 +754,25 @@ def therapists_search(
     return TherapistSearchResponse(results=results)
 
 
-@app.post("/chat", response_model=ChatResponse)
+def _chat_json(result: ChatResponse, response: Response) -> ORJSONResponse:
+    # ChatResponse already validated the payload when it was built, so it is
+    # dumped once and serialised by orjson instead of being re-validated
+    # against a response_model.  Cookies set on the injected Response are not
+    # merged into a directly returned response, so they are copied over.
+    json_response = ORJSONResponse(content=result.model_dump(mode="json"))
+    json_response.raw_headers.extend(
+        (key, value) for key, value in response.raw_headers if key == b"set-cookie"
+    )
+    return json_response
+
+
+@app.post("/chat", responses={200: {"model": ChatResponse}})
 def chat(
     payload: ChatRequest,
     request: Request,
     response: Response,
     db: Session = Depends(get_db),
-) -> ChatResponse:
+) -> ORJSONResponse:
     # --- Correlation ID for this request ---
     correlation_id = new_correlation_id()
     set_correlation_id(correlation_id)
@@ -733,12 +796,15 @@ def chat(
         if guest_token:
             used = _get_guest_prompt_count(guest_token)
             if used >= settings.guest_prompt_limit:
-                return ChatResponse(
-                    coach_message=(
-                        f"You've used all {settings.guest_prompt_limit} free guest prompts. "
-                        "Sign in with Google to continue chatting with unlimited access."
+                return _chat_json(
+                    ChatResponse(
+                        coach_message=(
+                            f"You've used all {settings.guest_prompt_limit} free guest prompts. "
+                            "Sign in with Google to continue chatting with unlimited access."
+                        ),
+                        risk_level="guest_limit_reached",
                     ),
-                    risk_level="guest_limit_reached",
+                    response,
                 )
 
     def _count_guest_prompt(result: ChatResponse) -> ChatResponse:
@@ -793,7 +859,7 @@ def chat(
     log_event("llm_call", route="LANGGRAPH_SUPERVISOR", duration_ms=round(t.elapsed_ms), correlation_id=correlation_id)
 
     final_response = ChatResponse(**response_json)
-    return _count_guest_prompt(final_response)
+    return _chat_json(_count_guest_prompt(final_response), response)
 
 
 @app.post("/payments/create-checkout-session", response_model=CheckoutSessionResponse)
@@ -1,7 +1,7 @@
 from datetime import datetime
 from uuid import UUID, uuid4
 
-from sqlalchemy import BigInteger, Boolean, DateTime, LargeBinary, String, Text, Uuid, func
+from sqlalchemy import BigInteger, Boolean, DateTime, Index, LargeBinary, String, Text, Uuid, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from .db import Base
@@ -55,6 +55,11 @@ class PendingAction(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), index=True)
     expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
 
+    # Covers load_pending_booking: filter on (user_id, action_type), newest first.
+    __table_args__ = (
+        Index("pending_actions_user_action_created_idx", "user_id", "action_type", "created_at"),
+    )
+
 
 class GuestSessionUsage(Base):
     __tablename__ = "guest_session_usage"
@@ -69,13 +74,13 @@ class GuestSessionUsage(Base):
     )
 
 
-class RateLimitEvent(Base):
-    __tablename__ = "rate_limit_events"
+class RateLimitWindow(Base):
+    __tablename__ = "rate_limit_windows"
 
-    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    client_key: Mapped[str] = mapped_column(String(255), index=True)
-    route_key: Mapped[str] = mapped_column(String(64), index=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), index=True)
+    client_key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    route_key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    window_start: Mapped[int] = mapped_column(BigInteger, index=True)
+    request_count: Mapped[int] = mapped_column(BigInteger, default=0)
 
 
 class GraphCheckpoint(Base):
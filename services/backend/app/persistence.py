@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from datetime import UTC, datetime, timedelta
+import time
 from typing import Any, Iterator, Sequence
 
 from langgraph.checkpoint.base import (
@@ -14,7 +14,8 @@ from langgraph.checkpoint.base import (
     get_checkpoint_metadata,
     RunnableConfig,
 )
-from sqlalchemy import delete, func, select
+from sqlalchemy import case, delete, func, or_, select, update
+from sqlalchemy.exc import IntegrityError
 
 from . import db
 from .models import (
@@ -22,7 +23,7 @@ from .models import (
     GraphCheckpointBlob,
     GraphCheckpointWrite,
     GuestSessionUsage,
-    RateLimitEvent,
+    RateLimitWindow,
 )
 
 
@@ -335,57 +336,107 @@ class RateLimitExceeded(Exception):
         super().__init__(f"Rate limit exceeded for {client_key!r}: max {limit} requests per {window}s")
 
 
+# Fixed-window counter: each (client_key, route_key) pair owns one row holding
+# the start of its current window and the requests seen in it, so a check is a
+# primary-key lookup no matter how many requests the window allows.
 class DurableRateLimiter:
-    def __init__(self, max_requests: int = 10, window_seconds: int = 60, route_key: str = "chat") -> None:
+    def __init__(
+        self,
+        max_requests: int = 10,
+        window_seconds: int = 60,
+        route_key: str = "chat",
+        sweep_every: int = 1000,
+        max_keys: int | None = None,
+    ) -> None:
         if max_requests < 1:
             raise ValueError("max_requests must be >= 1")
         if window_seconds < 1:
             raise ValueError("window_seconds must be >= 1")
+        if sweep_every < 1:
+            raise ValueError("sweep_every must be >= 1")
+        if max_keys is not None and max_keys < 1:
+            raise ValueError("max_keys must be >= 1")
         self._max_requests = max_requests
         self._window = window_seconds
         self._route_key = route_key
+        self._sweep_every = sweep_every
+        self._max_keys = max_keys
+        self._ops_since_sweep = 0
+
+    def _record_op(self) -> None:
+        # Amortised cleanup: every `sweep_every` admitted requests, drop expired
+        # windows (and enforce max_keys) so the table cannot grow without bound.
+        self._ops_since_sweep += 1
+        if self._ops_since_sweep >= self._sweep_every:
+            self._ops_since_sweep = 0
+            self.purge_expired()
 
-    def _cutoff(self) -> datetime:
-        return datetime.now(UTC) - timedelta(seconds=self._window)
+    def _window_expired(self, row: RateLimitWindow, now: int) -> bool:
+        return now - int(row.window_start) >= self._window
 
     def check(self, client_key: str) -> None:
         db.init_db()
-        cutoff = self._cutoff()
-        with db.SessionLocal() as session:
-            session.execute(delete(RateLimitEvent).where(RateLimitEvent.created_at < cutoff))
-            current = session.execute(
-                select(func.count()).select_from(RateLimitEvent).where(
-                    RateLimitEvent.client_key == client_key,
-                    RateLimitEvent.route_key == self._route_key,
-                    RateLimitEvent.created_at >= cutoff,
+        now = int(time.time())
+        expired = RateLimitWindow.window_start <= now - self._window
+        # Compare-and-swap in one statement: either start a new window or count
+        # the request, but only while the current window still has room. Two
+        # workers racing on the same key can therefore never both take the
+        # last slot.
+        consume = (
+            update(RateLimitWindow)
+            .where(
+                RateLimitWindow.client_key == client_key,
+                RateLimitWindow.route_key == self._route_key,
+                or_(expired, RateLimitWindow.request_count < self._max_requests),
+            )
+            .values(
+                window_start=case((expired, now), else_=RateLimitWindow.window_start),
+                request_count=case((expired, 1), else_=RateLimitWindow.request_count + 1),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        for _ in range(2):
+            with db.SessionLocal() as session:
+                if session.execute(consume).rowcount:
+                    session.commit()
+                    self._record_op()
+                    return
+                if session.get(RateLimitWindow, (client_key, self._route_key)) is not None:
+                    raise RateLimitExceeded(client_key=client_key, limit=self._max_requests, window=self._window)
+                session.add(
+                    RateLimitWindow(
+                        client_key=client_key,
+                        route_key=self._route_key,
+                        window_start=now,
+                        request_count=1,
+                    )
                 )
-            ).scalar_one()
-            if int(current) >= self._max_requests:
-                session.commit()
-                raise RateLimitExceeded(client_key=client_key, limit=self._max_requests, window=self._window)
-            session.add(RateLimitEvent(client_key=client_key, route_key=self._route_key))
-            session.commit()
+                try:
+                    session.commit()
+                except IntegrityError:
+                    # Another worker created the row first; retry against it.
+                    session.rollback()
+                    continue
+            self._record_op()
+            return
+        raise RateLimitExceeded(client_key=client_key, limit=self._max_requests, window=self._window)
 
     def remaining(self, client_key: str) -> int:
         db.init_db()
-        cutoff = self._cutoff()
+        now = int(time.time())
         with db.SessionLocal() as session:
-            current = session.execute(
-                select(func.count()).select_from(RateLimitEvent).where(
-                    RateLimitEvent.client_key == client_key,
-                    RateLimitEvent.route_key == self._route_key,
-                    RateLimitEvent.created_at >= cutoff,
-                )
-            ).scalar_one()
-        return max(0, self._max_requests - int(current))
+            row = session.get(RateLimitWindow, (client_key, self._route_key))
+            if row is None or self._window_expired(row, now):
+                return self._max_requests
+            return max(0, self._max_requests - int(row.request_count))
 
     def reset(self, client_key: str) -> None:
         db.init_db()
         with db.SessionLocal() as session:
             session.execute(
-                delete(RateLimitEvent).where(
-                    RateLimitEvent.client_key == client_key,
-                    RateLimitEvent.route_key == self._route_key,
+                delete(RateLimitWindow).where(
+                    RateLimitWindow.client_key == client_key,
+                    RateLimitWindow.route_key == self._route_key,
                 )
             )
             session.commit()
@@ -393,13 +444,40 @@ class DurableRateLimiter:
     def clear_all(self) -> None:
         db.init_db()
         with db.SessionLocal() as session:
-            session.execute(delete(RateLimitEvent).where(RateLimitEvent.route_key == self._route_key))
+            session.execute(delete(RateLimitWindow).where(RateLimitWindow.route_key == self._route_key))
             session.commit()
 
     def purge_expired(self) -> int:
         db.init_db()
-        cutoff = self._cutoff()
+        cutoff = int(time.time()) - self._window
         with db.SessionLocal() as session:
-            rows = session.execute(delete(RateLimitEvent).where(RateLimitEvent.created_at < cutoff))
+            rows = session.execute(
+                delete(RateLimitWindow).where(
+                    RateLimitWindow.route_key == self._route_key,
+                    RateLimitWindow.window_start <= cutoff,
+                )
+            )
+            purged = int(rows.rowcount or 0)
+            if self._max_keys is not None:
+                live = session.execute(
+                    select(func.count()).select_from(RateLimitWindow).where(
+                        RateLimitWindow.route_key == self._route_key,
+                    )
+                ).scalar_one()
+                overflow = int(live) - self._max_keys
+                if overflow > 0:
+                    oldest = (
+                        select(RateLimitWindow.client_key)
+                        .where(RateLimitWindow.route_key == self._route_key)
+                        .order_by(RateLimitWindow.window_start)
+                        .limit(overflow)
+                    )
+                    evicted = session.execute(
+                        delete(RateLimitWindow).where(
+                            RateLimitWindow.route_key == self._route_key,
+                            RateLimitWindow.client_key.in_(oldest.scalar_subquery()),
+                        )
+                    )
+                    purged += int(evicted.rowcount or 0)
             session.commit()
-            return int(rows.rowcount or 0)
+            return purged
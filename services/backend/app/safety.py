@@ -48,6 +48,38 @@ CRISIS_KEYWORDS = [
 # Stable order, no duplicates
 CRISIS_KEYWORDS = list(dict.fromkeys(CRISIS_KEYWORDS))
 
+
+def _compile_keyword_trie(keywords: list[str]) -> re.Pattern[str]:
+    """Compile literal keywords into one regex factored by shared prefixes.
+
+    The alternation is laid out as a trie ("i (?:want to (?:die|kill...)|am ...)"),
+    so each message position is tried against one branch per character instead
+    of once per keyword; the scan cost stays flat as the phrase list grows,
+    like an Aho-Corasick automaton, using only the stdlib.
+    """
+    trie: dict[str, dict] = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: dict[str, dict]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        ends_here = "" in node
+        if len(branches) == 1 and not ends_here:
+            return branches[0]
+        group = "(?:" + "|".join(branches) + ")"
+        return group + "?" if ends_here else group
+
+    return re.compile(build(trie))
+
+
+# Crisis checks sit on the hot path of every message, ahead of any LLM call.
+_CRISIS_RE = _compile_keyword_trie(CRISIS_KEYWORDS)
+
 # ---------------------------------------------------------------------------
 # EMOTIONAL STATE keywords — everyday feelings that route to COACH for
 # coping exercises. NOT crisis. NOT emergency numbers.
@@ -220,6 +252,12 @@ MEDICAL_ADVICE_OUTPUT_PATTERNS = [
     r"\bfluoxetine\b",
 ]
 
+# Output-only matcher: used exclusively by contains_medical_advice() on coach
+# responses, never by the user-input classifiers.
+_MEDICAL_ADVICE_OUTPUT_RE = re.compile(
+    "|".join(f"(?:{pattern})" for pattern in MEDICAL_ADVICE_OUTPUT_PATTERNS)
+)
+
 # ---------------------------------------------------------------------------
 # JAILBREAK patterns — expanded with 20+ patterns
 # ---------------------------------------------------------------------------
@@ -255,6 +293,11 @@ JAILBREAK_PATTERNS = [
     r"\bcan you (write|compose|create|generate) (a |an )?(\w+ )?(poem|story|song|essay|joke)\b",
 ]
 
+# All jailbreak patterns folded into one alternation so each message is scanned
+# once instead of once per pattern. None of the patterns use backreferences or
+# nested unbounded repeats, so the combined scan stays linear in input length.
+_JAILBREAK_RE = re.compile("|".join(f"(?:{pattern})" for pattern in JAILBREAK_PATTERNS))
+
 # ---------------------------------------------------------------------------
 # SCOPE: topics the app handles. Used by scope_check().
 # ---------------------------------------------------------------------------
@@ -281,8 +324,7 @@ def _contains_any(message: str, keywords: list[str]) -> bool:
 
 
 def contains_jailbreak_attempt(message: str) -> bool:
-    text = message.lower()
-    return any(re.search(pattern, text) for pattern in JAILBREAK_PATTERNS)
+    return _JAILBREAK_RE.search(message.lower()) is not None
 
 
 def contains_medical_advice(text: str) -> bool:
@@ -290,13 +332,12 @@ def contains_medical_advice(text: str) -> bool:
     Uses word-boundary regex to avoid false positives like
     'take a breath', 'doesn't', 'imagine', 'take care'.
     """
-    lower = text.lower()
-    return any(re.search(pattern, lower) for pattern in MEDICAL_ADVICE_OUTPUT_PATTERNS)
+    return _MEDICAL_ADVICE_OUTPUT_RE.search(text.lower()) is not None
 
 
 def is_crisis(message: str) -> bool:
     """True only for genuine acute crisis signals. NOT everyday emotions."""
-    return _contains_any(message, CRISIS_KEYWORDS)
+    return _CRISIS_RE.search(message.lower()) is not None
 
 
 def is_emotional_state(message: str) -> bool:
@@ -451,9 +492,15 @@ def filter_unsafe_response(response: ChatResponse) -> ChatResponse:
 def assess_conversation_risk(conversation_history: list[dict[str, str]]) -> Tuple[str, str | None]:
     if not conversation_history:
         return "normal", None
+    texts = [(turn.get("content") or "").strip() for turn in conversation_history]
+    # Most conversations are benign: scan all turns joined together once and
+    # only fall back to the per-turn pass when something matches. No keyword or
+    # pattern spans a newline, so the joined scan never misses a per-turn hit.
+    blob = "\n".join(texts)
+    if not (contains_jailbreak_attempt(blob) or is_crisis(blob) or is_prescription_request(blob)):
+        return "normal", None
     # Prioritize the latest user messages.
-    for turn in reversed(conversation_history):
-        text = (turn.get("content") or "").strip()
+    for text in reversed(texts):
         if not text:
             continue
         if contains_jailbreak_attempt(text):
@@ -511,72 +558,80 @@ def classify_intent(message: str) -> Intent:
     return "default"
 
 
+_BOX_BREATHING_EXERCISE = Exercise(
+    type="Box Breathing (4-4-4-4)",
+    steps=[
+        "Breathe in slowly through your nose for 4 counts.",
+        "Hold your breath for 4 counts.",
+        "Breathe out slowly through your mouth for 4 counts.",
+        "Hold for 4 counts. Repeat 4–6 times.",
+    ],
+    duration_seconds=120,
+)
+_FOUR_SEVEN_EIGHT_EXERCISE = Exercise(
+    type="4-7-8 Breathing",
+    steps=[
+        "Breathe in through your nose for 4 counts.",
+        "Hold your breath for 7 counts.",
+        "Breathe out through your mouth for 8 counts.",
+        "Repeat 3–4 times.",
+    ],
+    duration_seconds=90,
+)
+_OVERWHELMED_GROUNDING_EXERCISE = Exercise(
+    type="5-4-3-2-1 Grounding",
+    steps=[
+        "Name 5 things you can see right now.",
+        "Name 4 things you can physically feel (e.g. feet on floor, air on skin).",
+        "Name 3 things you can hear.",
+        "Name 2 things you can smell.",
+        "Name 1 thing you can taste.",
+    ],
+    duration_seconds=90,
+)
+_SELF_COMPASSION_EXERCISE = Exercise(
+    type="Gratitude & Self-Compassion Pause",
+    steps=[
+        "Place one hand on your heart and take a slow breath.",
+        "Acknowledge: 'I am having a hard time right now, and that's okay.'",
+        "Name one small thing that went okay today — even something tiny.",
+        "Take 3 slow, deep breaths before continuing your day.",
+    ],
+    duration_seconds=120,
+)
+_GROUNDING_EXERCISE = Exercise(
+    type="5-4-3-2-1 Grounding",
+    steps=[
+        "Name 5 things you can see.",
+        "Name 4 things you can feel.",
+        "Name 3 things you can hear.",
+        "Name 2 things you can smell.",
+        "Name 1 thing you can taste.",
+    ],
+    duration_seconds=90,
+)
+
+
 def emotional_state_coach_response(message: str) -> ChatResponse:
     """Return a warm coaching response with coping exercises for everyday emotions."""
     lower = message.lower()
 
-    # Pick a relevant exercise based on the emotion
+    # Pick a relevant exercise based on the emotion. The exercises are static,
+    # so they are built once at import time rather than on every request.
     if any(w in lower for w in ["panic", "panicking", "panic attack"]):
-        exercise = Exercise(
-            type="Box Breathing (4-4-4-4)",
-            steps=[
-                "Breathe in slowly through your nose for 4 counts.",
-                "Hold your breath for 4 counts.",
-                "Breathe out slowly through your mouth for 4 counts.",
-                "Hold for 4 counts. Repeat 4–6 times.",
-            ],
-            duration_seconds=120,
-        )
+        exercise = _BOX_BREATHING_EXERCISE
         intro = "It sounds like you're experiencing a panic attack. Let's try box breathing to calm your nervous system."
     elif any(w in lower for w in ["anxious", "anxiety", "nervous", "worried", "afraid", "fearful"]):
-        exercise = Exercise(
-            type="4-7-8 Breathing",
-            steps=[
-                "Breathe in through your nose for 4 counts.",
-                "Hold your breath for 7 counts.",
-                "Breathe out through your mouth for 8 counts.",
-                "Repeat 3–4 times.",
-            ],
-            duration_seconds=90,
-        )
+        exercise = _FOUR_SEVEN_EIGHT_EXERCISE
         intro = "Feeling anxious is really tough. Let's try 4-7-8 breathing — it activates your body's calming response."
     elif any(w in lower for w in ["overwhelmed", "stressed", "stress", "burnout", "burnt out", "exhausted"]):
-        exercise = Exercise(
-            type="5-4-3-2-1 Grounding",
-            steps=[
-                "Name 5 things you can see right now.",
-                "Name 4 things you can physically feel (e.g. feet on floor, air on skin).",
-                "Name 3 things you can hear.",
-                "Name 2 things you can smell.",
-                "Name 1 thing you can taste.",
-            ],
-            duration_seconds=90,
-        )
+        exercise = _OVERWHELMED_GROUNDING_EXERCISE
         intro = "It sounds like you're feeling overwhelmed. Let's ground you in the present moment with this quick exercise."
     elif any(w in lower for w in ["sad", "sadness", "depressed", "depression", "unhappy", "down", "hopeless", "lonely"]):
-        exercise = Exercise(
-            type="Gratitude & Self-Compassion Pause",
-            steps=[
-                "Place one hand on your heart and take a slow breath.",
-                "Acknowledge: 'I am having a hard time right now, and that's okay.'",
-                "Name one small thing that went okay today — even something tiny.",
-                "Take 3 slow, deep breaths before continuing your day.",
-            ],
-            duration_seconds=120,
-        )
+        exercise = _SELF_COMPASSION_EXERCISE
         intro = "I hear you — feeling sad or low is hard. Let's try a short self-compassion exercise together."
     else:
-        exercise = Exercise(
-            type="5-4-3-2-1 Grounding",
-            steps=[
-                "Name 5 things you can see.",
-                "Name 4 things you can feel.",
-                "Name 3 things you can hear.",
-                "Name 2 things you can smell.",
-                "Name 1 thing you can taste.",
-            ],
-            duration_seconds=90,
-        )
+        exercise = _GROUNDING_EXERCISE
         intro = "Thanks for sharing how you're feeling. Let's try a grounding exercise to help you feel more settled."
 
     return ChatResponse(
@@ -584,66 +639,88 @@ def emotional_state_coach_response(message: str) -> ChatResponse:
             f"{intro}\n\n"
             "After trying this, feel free to share how it went — I'm here to help you work through this."
         ),
-        exercise=exercise,
+        # Copy so a caller editing the steps cannot alter the shared exercise.
+        exercise=exercise.model_copy(deep=True),
         risk_level="normal",
     )
 
 
-def route_message(message: str) -> ChatResponse:
-    if is_crisis(message):
-        return ChatResponse(
-            coach_message=(
-                "I am really glad you reached out. Please seek immediate support right now. "
-                "If you might act on these thoughts or are in immediate danger, call 112 immediately. "
-                "You can also contact Mind Självmordslinjen at 90101 (chat/phone) for urgent emotional support, "
-                "and use 1177 Vårdguiden for healthcare guidance and where to get care."
-            ),
-            resources=[
-                Resource(title="Emergency services (Sweden) - 112", url="https://www.112.se/"),
-                Resource(title="Mind Självmordslinjen - 90101", url="https://mind.se/hitta-hjalp/sjalvmordslinjen/"),
-                Resource(title="1177 Vårdguiden", url="https://www.1177.se/"),
-            ],
-            risk_level="crisis"
-        )
+_CRISIS_RESPONSE = ChatResponse(
+    coach_message=(
+        "I am really glad you reached out. Please seek immediate support right now. "
+        "If you might act on these thoughts or are in immediate danger, call 112 immediately. "
+        "You can also contact Mind Självmordslinjen at 90101 (chat/phone) for urgent emotional support, "
+        "and use 1177 Vårdguiden for healthcare guidance and where to get care."
+    ),
+    resources=[
+        Resource(title="Emergency services (Sweden) - 112", url="https://www.112.se/"),
+        Resource(title="Mind Självmordslinjen - 90101", url="https://mind.se/hitta-hjalp/sjalvmordslinjen/"),
+        Resource(title="1177 Vårdguiden", url="https://www.1177.se/"),
+    ],
+    risk_level="crisis"
+)
+
+_PRESCRIPTION_RESPONSE = ChatResponse(
+    coach_message=(
+        "This is beyond my capability. I can't help with prescriptions, dosing, or medication changes. "
+        "Please contact a licensed clinician or pharmacist. If you think you may be in danger "
+        "(e.g., overdose, severe reaction), call your local emergency number now (Sweden: 112)."
+    ),
+    resources=[
+        Resource(title="Emergency services (Sweden)", url="https://www.112.se/"),
+        Resource(title="Healthcare advice (Sweden)", url="https://www.1177.se/"),
+        Resource(title="Mindler", url="https://www.mindler.se/"),
+        Resource(title="Kry", url="https://www.kry.se/"),
+        Resource(title="Psychology Today", url="https://www.psychologytoday.com/")
+    ],
+    premium_cta=PremiumCta(
+        enabled=True,
+        message="Premium unlocks extra coaching features and therapist directory access."
+    ),
+    risk_level="crisis"
+)
+
+_DEFAULT_GROUNDING_RESPONSE = ChatResponse(
+    coach_message=(
+        "Thanks for sharing. Let us slow things down together. Here is a short grounding exercise to try."
+    ),
+    exercise=Exercise(
+        type="5-4-3-2-1 grounding",
+        steps=[
+            "Name 5 things you can see.",
+            "Name 4 things you can feel.",
+            "Name 3 things you can hear.",
+            "Name 2 things you can smell.",
+            "Name 1 thing you can taste."
+        ],
+        duration_seconds=90
+    )
+)
+
+# Static responses keyed by intent; only "emotional_state" is built per message.
+_INTENT_RESPONSE: dict[Intent, ChatResponse] = {
+    "crisis": _CRISIS_RESPONSE,
+    "prescription": _PRESCRIPTION_RESPONSE,
+    "default": _DEFAULT_GROUNDING_RESPONSE,
+}
 
-    if is_prescription_request(message):
-        return ChatResponse(
-            coach_message=(
-                "This is beyond my capability. I can't help with prescriptions, dosing, or medication changes. "
-                "Please contact a licensed clinician or pharmacist. If you think you may be in danger "
-                "(e.g., overdose, severe reaction), call your local emergency number now (Sweden: 112)."
-            ),
-            resources=[
-                Resource(title="Emergency services (Sweden)", url="https://www.112.se/"),
-                Resource(title="Healthcare advice (Sweden)", url="https://www.1177.se/"),
-                Resource(title="Mindler", url="https://www.mindler.se/"),
-                Resource(title="Kry", url="https://www.kry.se/"),
-                Resource(title="Psychology Today", url="https://www.psychologytoday.com/")
-            ],
-            premium_cta=PremiumCta(
-                enabled=True,
-                message="Premium unlocks extra coaching features and therapist directory access."
-            ),
-            risk_level="crisis"
-        )
 
-    # Emotional states → coping exercises
+def _route_intent(message: str) -> Intent:
+    # Unlike classify_intent, the static router has no therapist search branch,
+    # so prescription requests take precedence over emotional states.
+    if is_crisis(message):
+        return "crisis"
+    if is_prescription_request(message):
+        return "prescription"
     if is_emotional_state(message):
-        return emotional_state_coach_response(message)
+        return "emotional_state"
+    return "default"
 
-    return ChatResponse(
-        coach_message=(
-            "Thanks for sharing. Let us slow things down together. Here is a short grounding exercise to try."
-        ),
-        exercise=Exercise(
-            type="5-4-3-2-1 grounding",
-            steps=[
-                "Name 5 things you can see.",
-                "Name 4 things you can feel.",
-                "Name 3 things you can hear.",
-                "Name 2 things you can smell.",
-                "Name 1 thing you can taste."
-            ],
-            duration_seconds=90
-        )
-    )
+
+def route_message(message: str) -> ChatResponse:
+    intent = _route_intent(message)
+    if intent == "emotional_state":
+        return emotional_state_coach_response(message)
+    # Hand out a deep copy so callers can set per-request fields, or edit the
+    # resource and exercise models, without touching the shared response.
+    return _INTENT_RESPONSE[intent].model_copy(deep=True)
@@ -7,51 +7,92 @@ from sqlalchemy import text
 
 from .. import db
 from ..embed_dimension import get_active_embedding_dim
-from ..embeddings import get_embedding
+from ..embeddings import get_embeddings
 
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_BATCH_SIZE = 64
+STAGING_TABLE = "reindex_chunk_embeddings"
 
-def _vector_literal(values: list[float]) -> str:
-    return "[" + ",".join(f"{value:.6f}" for value in values) + "]"
 
+def _copy_embeddings(conn, rows: list[tuple[int, str]]) -> None:
+    """Bulk-load (id, vector literal) rows into the staging table with COPY."""
+    raw_conn = conn.connection.driver_connection
+    with raw_conn.cursor() as cursor:
+        with cursor.copy(f"COPY {STAGING_TABLE} (id, embedding) FROM STDIN") as copy:
+            for row in rows:
+                copy.write_row(row)
 
-def reindex_embeddings(log_every: int = 25) -> dict[str, int]:
+
+def reindex_embeddings(log_every: int = 25, batch_size: int = DEFAULT_BATCH_SIZE) -> dict[str, int]:
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1.")
     db.init_db()
     active_dim = get_active_embedding_dim()
     db.ensure_embedding_dimension_compatible()
     with db.engine.begin() as conn:
-        rows = conn.execute(
-            text("SELECT id, text FROM chunks ORDER BY id;")
-        ).fetchall()
-        total = len(rows)
+        total = int(conn.execute(text("SELECT count(*) FROM chunks;")).scalar_one())
         if total == 0:
             logger.info("Reindex complete. No chunks found.")
             return {"total_chunks": 0, "updated_chunks": 0}
 
-        conn.execute(text("UPDATE chunks SET embedding = NULL;"))
+        # New vectors are staged with COPY and applied in one set-based UPDATE,
+        # instead of issuing one UPDATE statement per chunk.
+        conn.execute(
+            text(
+                f"""
+                CREATE TEMP TABLE {STAGING_TABLE} (
+                    id int PRIMARY KEY,
+                    embedding vector({active_dim})
+                ) ON COMMIT DROP;
+                """
+            )
+        )
         updated = 0
-        logger.info("Starting reindex for %s chunks using embed_dim=%s", total, active_dim)
-        for chunk_id, chunk_text in rows:
-            embedding = get_embedding(chunk_text)
-            if len(embedding) != active_dim:
+        logged = 0
+        logger.info(
+            "Starting reindex for %s chunks using embed_dim=%s batch_size=%s",
+            total,
+            active_dim,
+            batch_size,
+        )
+        # Stream chunk rows through a server-side cursor one batch at a time
+        # instead of materialising the whole table in memory. yield_per sizes
+        # the cursor's fetches to the embedding batch, so each round trip to
+        # the database feeds exactly one provider request.
+        rows = conn.execute(
+            text("SELECT id, text FROM chunks ORDER BY id;"),
+            execution_options={"yield_per": batch_size},
+        )
+        for batch in rows.partitions():
+            embeddings = get_embeddings([chunk_text for _, chunk_text in batch])
+            # One model produces one dimension, so validating the first vector
+            # is enough; a stray mismatch would still be rejected by the
+            # vector(N) column on COPY.
+            if updated == 0 and embeddings and len(embeddings[0]) != active_dim:
                 raise RuntimeError(
-                    f"Embedding dimension {len(embedding)} does not match active dimension {active_dim}."
+                    f"Embedding dimension {len(embeddings[0])} does not match active dimension {active_dim}."
                 )
-            conn.execute(
-                text(
-                    """
-                    UPDATE chunks
-                    SET embedding = (:embedding)::vector
-                    WHERE id = :id;
-                    """
-                ),
-                {"id": int(chunk_id), "embedding": _vector_literal(embedding)}
-            )
-            updated += 1
-            if log_every > 0 and updated % log_every == 0:
+            staged = [
+                (int(chunk_id), db.vector_literal(embedding))
+                for (chunk_id, _), embedding in zip(batch, embeddings)
+            ]
+            _copy_embeddings(conn, staged)
+            updated += len(staged)
+            if log_every > 0 and updated // log_every > logged:
+                logged = updated // log_every
                 logger.info("Reindex progress: %s/%s chunks", updated, total)
+        conn.execute(
+            text(
+                f"""
+                UPDATE chunks
+                SET embedding = staged.embedding
+                FROM {STAGING_TABLE} AS staged
+                WHERE chunks.id = staged.id;
+                """
+            )
+        )
         logger.info("Reindex complete. Updated %s/%s chunks.", updated, total)
         return {"total_chunks": total, "updated_chunks": updated}
 
@@ -59,10 +100,16 @@ def reindex_embeddings(log_every: int = 25) -> dict[str, int]:
 def main() -> None:
     parser = argparse.ArgumentParser(description="Re-embed all chunk vectors with active provider.")
     parser.add_argument("--log-every", type=int, default=25)
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help="Number of chunks embedded per provider request.",
+    )
     args = parser.parse_args()
 
     logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
-    result = reindex_embeddings(log_every=args.log_every)
+    result = reindex_embeddings(log_every=args.log_every, batch_size=args.batch_size)
     print(
         "Reindex complete: "
         f"{result['updated_chunks']}/{result['total_chunks']} chunks updated."
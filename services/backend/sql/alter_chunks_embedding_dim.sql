@@ -32,11 +32,16 @@ BEGIN
 
     IF current_typmod <> target_dim AND current_typmod <> target_dim + 4 THEN
         EXECUTE 'DROP INDEX IF EXISTS chunks_embedding_ivfflat_idx';
+        EXECUTE 'DROP INDEX IF EXISTS chunks_embedding_halfvec_idx';
         EXECUTE format(
             'ALTER TABLE chunks ALTER COLUMN embedding TYPE vector(%s) USING NULL',
             target_dim
         );
-        EXECUTE 'CREATE INDEX IF NOT EXISTS chunks_embedding_ivfflat_idx ON chunks USING ivfflat (embedding) WITH (lists = 100)';
+        EXECUTE format(
+            'CREATE INDEX IF NOT EXISTS chunks_embedding_halfvec_idx ON chunks '
+            'USING ivfflat ((embedding::halfvec(%s)) halfvec_cosine_ops) WITH (lists = 100)',
+            target_dim
+        );
     END IF;
 END
 $$;
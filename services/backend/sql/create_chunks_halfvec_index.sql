@@ -0,0 +1,47 @@
+-- Build the ANN index on chunks.embedding that retrieval uses.
+-- Vectors are stored at full precision, but the index is built over a
+-- half-precision copy with the cosine opclass used by retrieval, halving index
+-- size and scan bandwidth. It supersedes the old L2 ivfflat index, which the
+-- cosine query could never use, so that index is dropped.
+-- This script is idempotent. It requires pgvector 0.7 or newer.
+-- Building the index scans every row of chunks, so run it once as a migration,
+-- not on every application start.
+--
+-- Usage:
+--   psql "$DATABASE_URL" -v target_dim=1536 -f services/backend/sql/create_chunks_halfvec_index.sql
+--
+-- target_dim must match chunks.embedding; run alter_chunks_embedding_dim.sql first if it does not.
+
+DO $$
+DECLARE
+    current_typmod integer;
+    target_dim integer := :'target_dim';
+BEGIN
+    SELECT a.atttypmod
+    INTO current_typmod
+    FROM pg_attribute a
+    JOIN pg_class c ON c.oid = a.attrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = 'public'
+      AND c.relname = 'chunks'
+      AND a.attname = 'embedding'
+      AND a.attnum > 0
+      AND NOT a.attisdropped
+    LIMIT 1;
+
+    IF current_typmod IS NULL THEN
+        RAISE EXCEPTION 'chunks.embedding column not found';
+    END IF;
+
+    IF current_typmod <> target_dim AND current_typmod <> target_dim + 4 THEN
+        RAISE EXCEPTION 'chunks.embedding does not have dimension %; run alter_chunks_embedding_dim.sql first', target_dim;
+    END IF;
+
+    EXECUTE 'DROP INDEX IF EXISTS chunks_embedding_ivfflat_idx';
+    EXECUTE format(
+        'CREATE INDEX IF NOT EXISTS chunks_embedding_halfvec_idx ON chunks '
+        'USING ivfflat ((embedding::halfvec(%s)) halfvec_cosine_ops) WITH (lists = 100)',
+        target_dim
+    );
+END
+$$;
@@ -9,8 +9,11 @@ CREATE TABLE IF NOT EXISTS pending_actions (
     expires_at timestamptz NOT NULL
 );
 
-CREATE INDEX IF NOT EXISTS pending_actions_user_action_idx
-    ON pending_actions (user_id, action_type);
+CREATE INDEX IF NOT EXISTS pending_actions_user_action_created_idx
+    ON pending_actions (user_id, action_type, created_at);
+
+-- Superseded by the (user_id, action_type, created_at) index above.
+DROP INDEX IF EXISTS pending_actions_user_action_idx;
 
 CREATE INDEX IF NOT EXISTS pending_actions_expires_at_idx
     ON pending_actions (expires_at);
@@ -1,14 +1,35 @@
 import os
+from unittest import mock
 
+import anyio.from_thread
 import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, insert
+from sqlalchemy.orm import sessionmaker
 
-from app import config, db
-from app.runtime_requirements import ensure_backend_requirements
+# In-memory SQLite: db._make_engine serves it from a single StaticPool
+# connection shared by every thread, and nothing touches the disk.  Set before
+# the app is imported so the module-level engine is never built for Postgres.
+TEST_DATABASE_URL = "sqlite+pysqlite:///file:mh_skills_coach_test?mode=memory&cache=shared&uri=true"
+os.environ["DATABASE_URL"] = TEST_DATABASE_URL
 
-TEST_DATABASE_URL = "sqlite+pysqlite:///./test.db"
+from app import config, db  # noqa: E402
+from app.runtime_requirements import ensure_backend_requirements  # noqa: E402
 
 ensure_backend_requirements(install_missing=True)
 
+# Imported once here rather than inside the per-test fixtures below.
+from app.agent_graph import _GRAPH_CHECKPOINTER  # noqa: E402
+from app.main import _guest_prompt_store, _rate_limiter, app  # noqa: E402
+from app.models import User  # noqa: E402
+
+
+def _clear_stores() -> None:
+    # The checkpointer, guest prompt counts and rate limiter all persist to the DB.
+    _GRAPH_CHECKPOINTER.clear_all()
+    _guest_prompt_store.clear_all()
+    _rate_limiter.clear_all()
+
 
 @pytest.fixture(autouse=True, scope="session")
 def _configure_test_db():
@@ -17,16 +38,8 @@ def _configure_test_db():
     def reset_engine_and_clear(database_url: str | None = None) -> None:
         original_reset_engine(database_url)
         db.init_db()
-        from app.agent_graph import _GRAPH_CHECKPOINTER
-        from app.main import _guest_prompt_store, _rate_limiter
+        _clear_stores()
 
-        _GRAPH_CHECKPOINTER.clear_all()
-        _guest_prompt_store.clear_all()
-        _rate_limiter.clear_all()
-
-    if os.path.exists("./test.db"):
-        os.remove("./test.db")
-    os.environ["DATABASE_URL"] = TEST_DATABASE_URL
     config.settings.database_url = TEST_DATABASE_URL
     db.reset_engine = reset_engine_and_clear
     db.reset_engine(TEST_DATABASE_URL)
@@ -35,28 +48,14 @@ def _configure_test_db():
 
 
 @pytest.fixture(autouse=True)
-def _reset_rate_limiter():
-    from app.main import _rate_limiter
-    _rate_limiter.clear_all()
-    yield
-    _rate_limiter.clear_all()
-
-
-@pytest.fixture(autouse=True)
-def _reset_graph_checkpointer():
-    from app.agent_graph import _GRAPH_CHECKPOINTER
-
-    _GRAPH_CHECKPOINTER.clear_all()
-    yield
-    _GRAPH_CHECKPOINTER.clear_all()
-
-
-@pytest.fixture(autouse=True)
-def _reset_guest_prompt_counts():
-    from app.main import _guest_prompt_store
-    _guest_prompt_store.clear_all()
+def _reset_stores(request):
+    # Tests marked no_db never reach the stores, so skip the DELETEs around them.
+    if request.node.get_closest_marker("no_db"):
+        yield
+        return
+    _clear_stores()
     yield
-    _guest_prompt_store.clear_all()
+    _clear_stores()
 
 
 @pytest.fixture(autouse=True)
@@ -65,3 +64,123 @@ def _reset_settings_defaults():
     config.settings.dev_mode = False
     yield
     config.settings.dev_mode = original_dev_mode
+
+
+@pytest.fixture()
+def dev_mode(_reset_settings_defaults):
+    # _reset_settings_defaults restores the original value on teardown.
+    config.settings.dev_mode = True
+
+
+@pytest.fixture(scope="session")
+def app_instance():
+    # app.main is imported once per run; tests share the same FastAPI object.
+    return app
+
+
+@pytest.fixture(scope="session")
+def _session_client(app_instance):
+    # Without a portal TestClient starts a fresh event loop thread for every
+    # request.  Hold one open for the session so all requests share a loop;
+    # entering the client itself would also run the lifespan, which needs a
+    # configured LLM provider.
+    client = TestClient(app_instance)
+    with anyio.from_thread.start_blocking_portal(**client.async_backend) as portal:
+        client.portal = portal
+        yield client
+        client.portal = None
+
+
+@pytest.fixture()
+def client(_session_client):
+    # One TestClient for the whole run; cookies are per-test state.
+    _session_client.cookies.clear()
+    yield _session_client
+    _session_client.cookies.clear()
+
+
+@pytest.fixture()
+def db_session(monkeypatch):
+    # Runs the test inside one outer transaction on the shared in-memory
+    # connection and rolls it back afterwards.  Every session (the test's and
+    # the app's, via db.SessionLocal) joins it through a SAVEPOINT, so their
+    # commits never reach the schema and no cleanup DML is needed.
+    connection = db.engine.connect()
+    # pysqlite only emits BEGIN lazily and breaks SAVEPOINT semantics; let
+    # SQLAlchemy issue BEGIN itself for the duration of the test.
+    driver_connection = connection.connection.driver_connection
+    previous_isolation_level = driver_connection.isolation_level
+    driver_connection.isolation_level = None
+
+    def _emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    event.listen(connection, "begin", _emit_begin)
+    transaction = connection.begin()
+    session_factory = sessionmaker(
+        bind=connection,
+        autocommit=False,
+        autoflush=False,
+        join_transaction_mode="create_savepoint",
+    )
+    monkeypatch.setattr(db, "SessionLocal", session_factory)
+    # The schema already exists, and init_db's own BEGIN would collide with the
+    # outer transaction on the shared connection.
+    monkeypatch.setattr(db, "init_db", lambda: None)
+    session = session_factory()
+    yield session
+    session.close()
+    transaction.rollback()
+    event.remove(connection, "begin", _emit_begin)
+    driver_connection.isolation_level = previous_isolation_level
+    connection.close()
+
+
+@pytest.fixture()
+def make_user(db_session):
+    # Core INSERT ... RETURNING: one statement per user and no ORM refresh.
+    def _make_user(**values) -> str:
+        user_id = db_session.execute(
+            insert(User).returning(User.id),
+            {"is_premium": False, **values},
+        ).scalar_one()
+        db_session.commit()
+        return str(user_id)
+
+    return _make_user
+
+
+DEFAULT_CLINIC = {
+    "name": "Test Clinic",
+    "address": "1 Main St, Stockholm",
+    "url": "https://example.com/test-clinic",
+    "phone": "+46 8 000 000",
+    "distance_km": 2.0,
+}
+
+
+def _search_side_effect(results=(DEFAULT_CLINIC,), capture: list | None = None):
+    # Returns copies of ``results`` and, when ``capture`` is a list, appends
+    # the keyword arguments of each call.
+    def _search_with_retries(self, **kwargs):
+        if capture is not None:
+            capture.append(kwargs)
+        return [dict(item) for item in results], None
+
+    return _search_with_retries
+
+
+@pytest.fixture()
+def search_stub():
+    # Autospec keeps the real signature (and passes self); defaults to one
+    # DEFAULT_CLINIC result, tests swap it with search_stub.returns(...).
+    with mock.patch(
+        "app.agents.therapist_agent.TherapistSearchHandler.search_with_retries",
+        autospec=True,
+    ) as stub:
+        def _returns(results=(DEFAULT_CLINIC,), capture: list | None = None) -> None:
+            stub.side_effect = _search_side_effect(results, capture)
+
+        stub.returns = _returns
+        _returns()
+        yield stub
@@ -1,26 +1,35 @@
 import base64
 import json
 import logging
-import os
 from uuid import UUID
 
-os.environ["DATABASE_URL"] = "sqlite+pysqlite:///./test.db"
-
-from fastapi.testclient import TestClient
+import httpx
+import pytest
 
 from app.config import settings
 from app import db
 from app.db import init_db
-from app.main import app
 import app.main as main
 from app.models import User
 
 
-def test_state_mismatch_returns_400(monkeypatch):
+@pytest.fixture
+def google_stub_settings(monkeypatch):
     monkeypatch.setattr(settings, "google_client_id", None)
     monkeypatch.setattr(settings, "google_client_secret", None)
-    client = TestClient(app)
+    monkeypatch.setattr(settings, "frontend_url", "http://localhost:3000")
+    return settings
+
+
+@pytest.fixture
+def google_oauth_settings(monkeypatch):
+    monkeypatch.setattr(settings, "google_client_id", "client-id")
+    monkeypatch.setattr(settings, "google_client_secret", "client-secret")
+    monkeypatch.setattr(settings, "frontend_url", "http://localhost:3000")
+    return settings
+
 
+def test_state_mismatch_returns_400(google_stub_settings, client):
     client.cookies.set("oauth_state", "good")
     client.cookies.set("pkce_verifier", "ver")
     response = client.get("/auth/google/callback?code=abc&state=bad")
@@ -28,22 +37,15 @@ def test_state_mismatch_returns_400(monkeypatch):
     assert response.status_code == 400
 
 
-def test_missing_pkce_returns_400(monkeypatch):
-    monkeypatch.setattr(settings, "google_client_id", None)
-    monkeypatch.setattr(settings, "google_client_secret", None)
-    client = TestClient(app)
-
+def test_missing_pkce_returns_400(google_stub_settings, client):
     client.cookies.set("oauth_state", "ok")
     response = client.get("/auth/google/callback?code=abc&state=ok")
 
     assert response.status_code == 400
 
 
-def test_stub_mode_sets_session_cookie(monkeypatch):
-    monkeypatch.setattr(settings, "google_client_id", None)
-    monkeypatch.setattr(settings, "google_client_secret", None)
+def test_stub_mode_sets_session_cookie(google_stub_settings, client):
     init_db()
-    client = TestClient(app)
 
     client.cookies.set("oauth_state", "ok")
     client.cookies.set("pkce_verifier", "ver")
@@ -54,10 +56,7 @@ def test_stub_mode_sets_session_cookie(monkeypatch):
     assert settings.session_cookie_name in response.cookies
 
 
-def test_access_denied_redirects(monkeypatch):
-    monkeypatch.setattr(settings, "frontend_url", "http://localhost:3000")
-    client = TestClient(app)
-
+def test_access_denied_redirects(google_stub_settings, client):
     response = client.get(
         "/auth/google/callback?error=access_denied&state=ignored",
         follow_redirects=False
@@ -74,11 +73,7 @@ def _encode_segment(payload: dict[str, object]) -> str:
     return encoded.rstrip("=")
 
 
-def test_id_token_invalid_logs_decoded_claims(monkeypatch, caplog):
-    monkeypatch.setattr(settings, "google_client_id", "client-id")
-    monkeypatch.setattr(settings, "google_client_secret", "client-secret")
-    monkeypatch.setattr(settings, "frontend_url", "http://localhost:3000")
-
+def test_id_token_invalid_logs_decoded_claims(google_oauth_settings, monkeypatch, caplog, client):
     header = _encode_segment({"alg": "RS256", "typ": "JWT"})
     payload = _encode_segment({
         "iss": "accounts.google.com",
@@ -88,29 +83,27 @@ def test_id_token_invalid_logs_decoded_claims(monkeypatch, caplog):
     })
     fake_token = f"{header}.{payload}.sig"
 
-    class DummyResponse:
-        status_code = 200
-
-        def raise_for_status(self) -> None:
-            return None
-
-        def json(self) -> dict[str, str]:
-            return {
+    def token_endpoint(request: httpx.Request) -> httpx.Response:
+        assert str(request.url) == main.GOOGLE_TOKEN_URL
+        return httpx.Response(
+            200,
+            json={
                 "access_token": "access",
                 "id_token": fake_token,
                 "token_type": "Bearer"
-            }
-
-    def fake_post(*_args, **_kwargs):
-        return DummyResponse()
+            },
+        )
 
     def fake_verify(*_args, **_kwargs):
         raise ValueError("signature verification failed")
 
-    monkeypatch.setattr(main.httpx, "post", fake_post)
+    monkeypatch.setattr(
+        main,
+        "_GOOGLE_TOKEN_CLIENT",
+        httpx.Client(transport=httpx.MockTransport(token_endpoint)),
+    )
     monkeypatch.setattr(main.google_id_token, "verify_oauth2_token", fake_verify)
 
-    client = TestClient(app)
     client.cookies.set("oauth_state", "ok")
     client.cookies.set("pkce_verifier", "ver")
 
@@ -127,10 +120,7 @@ def test_id_token_invalid_logs_decoded_claims(monkeypatch, caplog):
     )
 
 
-def test_google_callback_upserts_by_google_sub_and_sets_session_cookie(monkeypatch):
-    monkeypatch.setattr(settings, "google_client_id", "client-id")
-    monkeypatch.setattr(settings, "google_client_secret", "client-secret")
-    monkeypatch.setattr(settings, "frontend_url", "http://localhost:3000")
+def test_google_callback_upserts_by_google_sub_and_sets_session_cookie(google_oauth_settings, monkeypatch, client):
     init_db()
 
     token_payload = {
@@ -150,7 +140,6 @@ def test_google_callback_upserts_by_google_sub_and_sets_session_cookie(monkeypat
         }
     )
 
-    client = TestClient(app)
     client.cookies.set("oauth_state", "ok")
     client.cookies.set("pkce_verifier", "ver")
 
@@ -170,3 +159,25 @@ def test_google_callback_upserts_by_google_sub_and_sets_session_cookie(monkeypat
         users = session.query(User).filter(User.google_sub == "google-sub-123").all()
         assert len(users) == 1
         assert users[0].email == "upsert@example.com"
+
+
+def test_google_cert_request_reuses_response_within_max_age(monkeypatch):
+    calls = []
+
+    class FakeCertsResponse:
+        status_code = 200
+        headers = {"cache-control": "public, max-age=3600, must-revalidate"}
+        content = b'{"kid": "cert"}'
+
+    def fake_request(method, url, **_kwargs):
+        calls.append((method, url))
+        return FakeCertsResponse()
+
+    cert_request = main._CachingGoogleRequest()
+    monkeypatch.setattr(cert_request.session, "request", fake_request)
+
+    first = cert_request("https://www.googleapis.com/oauth2/v1/certs")
+    second = cert_request("https://www.googleapis.com/oauth2/v1/certs")
+
+    assert first.data == second.data == b'{"kid": "cert"}'
+    assert calls == [("GET", "https://www.googleapis.com/oauth2/v1/certs")]
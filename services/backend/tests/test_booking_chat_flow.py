@@ -2,34 +2,18 @@ import json
 from datetime import datetime, timedelta, timezone
 
 import pytest
-from fastapi.testclient import TestClient
 
 from app import db
 from app.config import settings
-from app.main import BOOKING_SESSION_COOKIE_NAME, app
-from app.models import PendingAction, User
+from app.main import BOOKING_SESSION_COOKIE_NAME
+from app.models import PendingAction
 
 
 @pytest.fixture()
-def booking_db():
-    original_url = str(db.engine.url)
-    db.reset_engine("sqlite+pysqlite:///./test_booking_chat.db")
-    db.init_db()
-    with db.SessionLocal() as session:
-        session.query(PendingAction).delete()
-        session.query(User).delete()
-        session.commit()
-    yield
-    db.reset_engine(original_url)
-
-
-def _create_user() -> User:
-    with db.SessionLocal() as session:
-        user = User(email="booker@example.com", name="Booker", is_premium=False)
-        session.add(user)
-        session.commit()
-        session.refresh(user)
-        return user
+def authed_client(make_user, client):
+    user_id = make_user(email="booker@example.com", name="Booker")
+    client.cookies.set(settings.session_cookie_name, user_id)
+    return client, user_id
 
 
 def _pending_count(user_id: str) -> int:
@@ -49,10 +33,8 @@ def _pending_payload(user_id: str) -> dict:
     return json.loads(row.payload_json)
 
 
-def test_booking_missing_email_asks_for_email(booking_db):
-    user = _create_user()
-    client = TestClient(app)
-    client.cookies.set(settings.session_cookie_name, str(user.id))
+def test_booking_missing_email_asks_for_email(authed_client):
+    client, _ = authed_client
 
     response = client.post("/chat", json={"message": "Email therapist for an appointment tomorrow 3pm"})
 
@@ -62,10 +44,8 @@ def test_booking_missing_email_asks_for_email(booking_db):
     assert payload.get("requires_confirmation") is False
 
 
-def test_booking_missing_time_asks_for_time(booking_db):
-    user = _create_user()
-    client = TestClient(app)
-    client.cookies.set(settings.session_cookie_name, str(user.id))
+def test_booking_missing_time_asks_for_time(authed_client):
+    client, _ = authed_client
 
     response = client.post(
         "/chat",
@@ -78,8 +58,8 @@ def test_booking_missing_time_asks_for_time(booking_db):
     assert payload.get("requires_confirmation") is False
 
 
-def test_booking_complete_creates_pending_and_does_not_send(monkeypatch, booking_db):
-    user = _create_user()
+def test_booking_complete_creates_pending_and_does_not_send(monkeypatch, authed_client):
+    client, user_id = authed_client
     called = {"send": 0}
 
     def send_stub(*args, **kwargs):
@@ -87,8 +67,6 @@ def test_booking_complete_creates_pending_and_does_not_send(monkeypatch, booking
         return {"ok": True, "message_id": "<msg>"}
 
     monkeypatch.setattr("app.main.send_email_for_user", send_stub)
-    client = TestClient(app)
-    client.cookies.set(settings.session_cookie_name, str(user.id))
 
     response = client.post(
         "/chat",
@@ -100,11 +78,11 @@ def test_booking_complete_creates_pending_and_does_not_send(monkeypatch, booking
     assert payload["requires_confirmation"] is True
     assert payload["booking_proposal"]["therapist_email"] == "therapist@example.com"
     assert called["send"] == 0
-    assert _pending_count(str(user.id)) == 1
+    assert _pending_count(user_id) == 1
 
 
-def test_booking_yes_sends_and_clears_pending(monkeypatch, booking_db):
-    user = _create_user()
+def test_booking_yes_sends_and_clears_pending(monkeypatch, authed_client):
+    client, user_id = authed_client
     called = {"send": 0}
 
     def send_stub(*args, **kwargs):
@@ -112,8 +90,6 @@ def test_booking_yes_sends_and_clears_pending(monkeypatch, booking_db):
         return {"ok": True, "message_id": "<msg>"}
 
     monkeypatch.setattr("app.main.send_email_for_user", send_stub)
-    client = TestClient(app)
-    client.cookies.set(settings.session_cookie_name, str(user.id))
     client.post(
         "/chat",
         json={"message": "Email therapist at therapist@example.com for an appointment on 2026-02-14 15:00"}
@@ -125,19 +101,17 @@ def test_booking_yes_sends_and_clears_pending(monkeypatch, booking_db):
     payload = response.json()
     assert "sent" in payload["coach_message"].lower()
     assert called["send"] == 1
-    assert _pending_count(str(user.id)) == 0
+    assert _pending_count(user_id) == 0
 
 
-def test_booking_no_cancels_and_clears_pending(monkeypatch, booking_db):
-    user = _create_user()
+def test_booking_no_cancels_and_clears_pending(monkeypatch, authed_client):
+    client, user_id = authed_client
     called = {"send": 0}
 
     monkeypatch.setattr(
         "app.main.send_email_for_user",
         lambda *args, **kwargs: called.__setitem__("send", called["send"] + 1)
     )
-    client = TestClient(app)
-    client.cookies.set(settings.session_cookie_name, str(user.id))
     client.post(
         "/chat",
         json={"message": "Email therapist at therapist@example.com for an appointment on 2026-02-14 15:00"}
@@ -149,11 +123,11 @@ def test_booking_no_cancels_and_clears_pending(monkeypatch, booking_db):
     payload = response.json()
     assert "cancel" in payload["coach_message"].lower()
     assert called["send"] == 0
-    assert _pending_count(str(user.id)) == 0
+    assert _pending_count(user_id) == 0
 
 
-def test_expired_pending_prevents_send(monkeypatch, booking_db):
-    user = _create_user()
+def test_expired_pending_prevents_send(monkeypatch, authed_client):
+    client, user_id = authed_client
     called = {"send": 0}
 
     def send_stub(*args, **kwargs):
@@ -165,7 +139,7 @@ def test_expired_pending_prevents_send(monkeypatch, booking_db):
     with db.SessionLocal() as session:
         session.add(
             PendingAction(
-                user_id=str(user.id),
+                user_id=user_id,
                 action_type="booking_email",
                 payload_json=json.dumps(
                     {
@@ -181,19 +155,17 @@ def test_expired_pending_prevents_send(monkeypatch, booking_db):
         )
         session.commit()
 
-    client = TestClient(app)
-    client.cookies.set(settings.session_cookie_name, str(user.id))
     response = client.post("/chat", json={"message": "YES"})
 
     assert response.status_code == 200
     payload = response.json()
     assert "expired" in payload["coach_message"].lower()
     assert called["send"] == 0
-    assert _pending_count(str(user.id)) == 0
+    assert _pending_count(user_id) == 0
 
 
-def test_crisis_prevents_pending_creation_and_send(monkeypatch, booking_db):
-    user = _create_user()
+def test_crisis_prevents_pending_creation_and_send(monkeypatch, authed_client):
+    client, user_id = authed_client
     called = {"send": 0}
 
     def send_stub(*args, **kwargs):
@@ -201,8 +173,6 @@ def test_crisis_prevents_pending_creation_and_send(monkeypatch, booking_db):
         return {"ok": True}
 
     monkeypatch.setattr("app.main.send_email_for_user", send_stub)
-    client = TestClient(app)
-    client.cookies.set(settings.session_cookie_name, str(user.id))
 
     response = client.post(
         "/chat",
@@ -213,13 +183,11 @@ def test_crisis_prevents_pending_creation_and_send(monkeypatch, booking_db):
     payload = response.json()
     assert payload.get("risk_level") == "crisis"
     assert called["send"] == 0
-    assert _pending_count(str(user.id)) == 0
+    assert _pending_count(user_id) == 0
 
 
-def test_yes_without_pending_returns_guidance(booking_db):
-    user = _create_user()
-    client = TestClient(app)
-    client.cookies.set(settings.session_cookie_name, str(user.id))
+def test_yes_without_pending_returns_guidance(authed_client):
+    client, _ = authed_client
 
     response = client.post("/chat", json={"message": "YES"})
 
@@ -235,8 +203,8 @@ def test_yes_without_pending_returns_guidance(booking_db):
     assert payload.get("requires_confirmation") is not True
 
 
-def test_multiple_sequential_booking_emails_require_separate_confirmations(monkeypatch, booking_db):
-    user = _create_user()
+def test_multiple_sequential_booking_emails_require_separate_confirmations(monkeypatch, authed_client):
+    client, user_id = authed_client
     sent_to: list[str] = []
 
     def send_stub(user_id: str, payload):
@@ -244,8 +212,6 @@ def test_multiple_sequential_booking_emails_require_separate_confirmations(monke
         return {"ok": True, "message_id": "<msg>"}
 
     monkeypatch.setattr("app.main.send_email_for_user", send_stub)
-    client = TestClient(app)
-    client.cookies.set(settings.session_cookie_name, str(user.id))
 
     first = client.post(
         "/chat",
@@ -259,7 +225,7 @@ def test_multiple_sequential_booking_emails_require_separate_confirmations(monke
     confirm_first = client.post("/chat", json={"message": "YES"})
     assert confirm_first.status_code == 200
     assert "sent" in confirm_first.json()["coach_message"].lower()
-    assert _pending_count(str(user.id)) == 0
+    assert _pending_count(user_id) == 0
 
     second = client.post(
         "/chat",
@@ -269,17 +235,16 @@ def test_multiple_sequential_booking_emails_require_separate_confirmations(monke
     second_payload = second.json()
     assert second_payload["requires_confirmation"] is True
     assert second_payload["booking_proposal"]["therapist_email"] == "second@example.com"
-    assert _pending_count(str(user.id)) == 1
+    assert _pending_count(user_id) == 1
 
     confirm_second = client.post("/chat", json={"message": "YES"})
     assert confirm_second.status_code == 200
     assert "sent" in confirm_second.json()["coach_message"].lower()
-    assert _pending_count(str(user.id)) == 0
+    assert _pending_count(user_id) == 0
     assert sent_to == ["first@example.com", "second@example.com"]
 
 
-def test_multiturn_booking_persists_for_anonymous_session(booking_db):
-    client = TestClient(app)
+def test_multiturn_booking_persists_for_anonymous_session(db_session, client):
 
     first = client.post(
         "/chat",
@@ -306,8 +271,7 @@ def test_multiturn_booking_persists_for_anonymous_session(booking_db):
     assert second_payload["booking_proposal"]["therapist_email"] == "therapist@example.com"
 
 
-def test_email_intent_routes_to_booking_agent_not_coach(booking_db):
-    client = TestClient(app)
+def test_email_intent_routes_to_booking_agent_not_coach(db_session, client):
 
     response = client.post(
         "/chat",
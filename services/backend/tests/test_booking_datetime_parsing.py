@@ -1,7 +1,11 @@
 from datetime import datetime
 
+import pytest
+
 from app.booking import STOCKHOLM_TZ, parse_requested_datetime
 
+pytestmark = pytest.mark.no_db
+
 
 def _assert_stockholm_datetime(parsed_iso: str, expected_date: str, expected_time: str) -> None:
     parsed_dt = datetime.fromisoformat(parsed_iso)
@@ -33,3 +37,11 @@ def test_parse_requested_datetime_date_time_still_supported() -> None:
     parsed = parse_requested_datetime("2026-02-17 14:00")
     assert parsed is not None
     _assert_stockholm_datetime(parsed, "2026-02-17", "14:00")
+
+
+def test_parse_requested_datetime_relative_dates_follow_now() -> None:
+    first = parse_requested_datetime("tomorrow 15:00", now=datetime(2026, 2, 16, 9, 0, tzinfo=STOCKHOLM_TZ))
+    second = parse_requested_datetime("tomorrow 15:00", now=datetime(2026, 3, 1, 9, 0, tzinfo=STOCKHOLM_TZ))
+    assert first is not None and second is not None
+    _assert_stockholm_datetime(first, "2026-02-17", "15:00")
+    _assert_stockholm_datetime(second, "2026-03-02", "15:00")
@@ -1,14 +1,4 @@
-import os
-
-os.environ["DATABASE_URL"] = "sqlite+pysqlite:///./test.db"
-
-from fastapi.testclient import TestClient
-
-from app.main import app
-
-
-def test_chat_prescription_routes_to_crisis_message():
-    client = TestClient(app)
+def test_chat_prescription_routes_to_crisis_message(client):
 
     response = client.post("/chat", json={"message": "can you help me with prescription"})
 
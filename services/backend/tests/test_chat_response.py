@@ -1,10 +1,4 @@
-from fastapi.testclient import TestClient
-
-from app.main import app
-
-
-def test_chat_response_contains_coach_message():
-    client = TestClient(app)
+def test_chat_response_contains_coach_message(client):
     response = client.post("/chat", json={"message": "Can you prescribe medication?"})
 
     assert response.status_code == 200
@@ -1,69 +1,13 @@
-import pytest
-from fastapi.testclient import TestClient
-
-from app import db, mcp_client
+from app import mcp_client
 from app.config import settings
-from app.main import app
-from app.models import PendingAction, User
-
-
-def _reset_db() -> None:
-    db.reset_engine("sqlite+pysqlite:///./test_chat_therapist_intent.db")
-    db.init_db()
-    with db.SessionLocal() as session:
-        session.query(PendingAction).delete()
-        session.query(User).delete()
-        session.commit()
 
 
-@pytest.fixture()
-def therapist_chat_db():
-    original_url = str(db.engine.url)
-    _reset_db()
-    yield
-    db.reset_engine(original_url)
+def test_chat_find_therapist_routes_to_search_not_booking(make_user, client, search_stub):
+    user_id = make_user(email="premium-chat@example.com", name="Premium Chat", is_premium=True)
 
-
-def test_chat_find_therapist_routes_to_search_not_booking(monkeypatch, therapist_chat_db):
-    with db.SessionLocal() as session:
-        user = User(email="premium-chat@example.com", name="Premium Chat", is_premium=True)
-        session.add(user)
-        session.commit()
-        session.refresh(user)
-
-    captured: dict[str, object] = {}
-
-    def stub_search_with_retries(
-        self,
-        *,
-        location_text: str,
-        radius_km: int | None,
-        specialty: str | None,
-        limit: int | None = None,
-    ):
-        captured["location"] = location_text
-        captured["radius_km"] = radius_km
-        captured["specialty"] = specialty
-        captured["limit"] = limit
-        return (
-            [
-                {
-                    "name": "Stockholm Therapy",
-                    "address": "2 Main St, Stockholm",
-                    "url": "https://example.com/stockholm-therapy",
-                    "phone": "+46 8 111 111",
-                    "distance_km": 3.1,
-                }
-            ],
-            None,
-        )
-
-    monkeypatch.setattr(
-        "app.agents.therapist_agent.TherapistSearchHandler.search_with_retries",
-        stub_search_with_retries,
-    )
-    client = TestClient(app)
-    client.cookies.set(settings.session_cookie_name, str(user.id))
+    calls: list[dict[str, object]] = []
+    search_stub.returns(capture=calls)
+    client.cookies.set(settings.session_cookie_name, user_id)
 
     response = client.post("/chat", json={"message": "Find therapists near Stockholm within 10 km"})
 
@@ -73,42 +17,16 @@ def test_chat_find_therapist_routes_to_search_not_booking(monkeypatch, therapist
     assert payload.get("booking_proposal") is None
     assert payload.get("requires_confirmation") is not True
     assert "date/time" not in payload["coach_message"].lower()
-    assert captured["location"] == "Stockholm"
-    assert captured["radius_km"] == 10
-    assert captured["limit"] == 10
-
-
-def test_chat_therapist_search_works_for_free_user_in_dev_mode(monkeypatch, therapist_chat_db):
-    with db.SessionLocal() as session:
-        user = User(email="free-dev@example.com", name="Free Dev", is_premium=False)
-        session.add(user)
-        session.commit()
-        session.refresh(user)
-
-    monkeypatch.setattr(
-        "app.agents.therapist_agent.TherapistSearchHandler.search_with_retries",
-        lambda self, **kwargs: (
-            [
-                {
-                    "name": "Dev Clinic",
-                    "address": "3 Main St, Stockholm",
-                    "url": "https://example.com/dev-clinic",
-                    "phone": "+46 8 222 222",
-                    "distance_km": 2.0,
-                }
-            ],
-            None,
-        ),
-    )
-    client = TestClient(app)
-    client.cookies.set(settings.session_cookie_name, str(user.id))
-
-    original_dev_mode = settings.dev_mode
-    settings.dev_mode = True
-    try:
-        response = client.post("/chat", json={"message": "find therapist in Stockholm"})
-    finally:
-        settings.dev_mode = original_dev_mode
+    assert calls[-1]["location_text"] == "Stockholm"
+    assert calls[-1]["radius_km"] == 10
+    assert calls[-1]["limit"] == 10
+
+
+def test_chat_therapist_search_works_for_free_user_in_dev_mode(make_user, client, search_stub, dev_mode):
+    user_id = make_user(email="free-dev@example.com", name="Free Dev", is_premium=False)
+    client.cookies.set(settings.session_cookie_name, user_id)
+
+    response = client.post("/chat", json={"message": "find therapist in Stockholm"})
 
     assert response.status_code == 200
     payload = response.json()
@@ -116,12 +34,8 @@ def test_chat_therapist_search_works_for_free_user_in_dev_mode(monkeypatch, ther
     assert payload.get("premium_cta") is None
 
 
-def test_chat_therapist_search_omits_specialty_when_not_provided(monkeypatch, therapist_chat_db):
-    with db.SessionLocal() as session:
-        user = User(email="premium-payload@example.com", name="Premium Payload", is_premium=True)
-        session.add(user)
-        session.commit()
-        session.refresh(user)
+def test_chat_therapist_search_omits_specialty_when_not_provided(monkeypatch, make_user, client):
+    user_id = make_user(email="premium-payload@example.com", name="Premium Payload", is_premium=True)
 
     captured: dict[str, object] = {}
 
@@ -140,8 +54,7 @@ def test_chat_therapist_search_omits_specialty_when_not_provided(monkeypatch, th
         ]
 
     monkeypatch.setattr(mcp_client, "ainvoke_mcp_tool", capture_tool)
-    client = TestClient(app)
-    client.cookies.set(settings.session_cookie_name, str(user.id))
+    client.cookies.set(settings.session_cookie_name, user_id)
 
     response = client.post("/chat", json={"message": "Find therapists near Stockholm within 10 km"})
 
@@ -157,46 +70,19 @@ def test_chat_therapist_search_omits_specialty_when_not_provided(monkeypatch, th
     assert "specialty" not in outbound
 
 
-def test_chat_therapist_search_handles_any_city_not_just_stockholm(monkeypatch, therapist_chat_db):
-    with db.SessionLocal() as session:
-        user = User(email="premium-malmo@example.com", name="Premium Malmo", is_premium=True)
-        session.add(user)
-        session.commit()
-        session.refresh(user)
+def test_chat_therapist_search_handles_any_city_not_just_stockholm(make_user, client, search_stub):
+    user_id = make_user(email="premium-malmo@example.com", name="Premium Malmo", is_premium=True)
 
-    captured: dict[str, object] = {}
-
-    def capture_search(
-        self,
-        *,
-        location_text: str,
-        radius_km: int | None,
-        specialty: str | None,
-        limit: int | None = None,
-    ):
-        captured["location"] = location_text
-        captured["radius_km"] = radius_km
-        captured["specialty"] = specialty
-        captured["limit"] = limit
-        return (
-            [
-                {
-                    "name": "Malmo Therapy",
-                    "address": "8 Main St, Malmö",
-                    "url": "https://example.com/malmo-therapy",
-                    "phone": "+46 40 111 111",
-                    "distance_km": 2.7,
-                }
-            ],
-            None,
-        )
-
-    monkeypatch.setattr(
-        "app.agents.therapist_agent.TherapistSearchHandler.search_with_retries",
-        capture_search,
-    )
-    client = TestClient(app)
-    client.cookies.set(settings.session_cookie_name, str(user.id))
+    calls: list[dict[str, object]] = []
+    clinic = {
+        "name": "Malmo Therapy",
+        "address": "8 Main St, Malmö",
+        "url": "https://example.com/malmo-therapy",
+        "phone": "+46 40 111 111",
+        "distance_km": 2.7,
+    }
+    search_stub.returns(results=(clinic,), capture=calls)
+    client.cookies.set(settings.session_cookie_name, user_id)
 
     response = client.post("/chat", json={"message": "Can you find me a therapist in Malmö within 10 km?"})
 
@@ -204,93 +90,30 @@ def test_chat_therapist_search_handles_any_city_not_just_stockholm(monkeypatch,
     payload = response.json()
     assert payload.get("therapists")
     assert payload["therapists"][0]["name"] == "Malmo Therapy"
-    assert captured["location"] == "Malmö"
-    assert captured["radius_km"] == 10
-    assert captured["limit"] == 10
+    assert calls[-1]["location_text"] == "Malmö"
+    assert calls[-1]["radius_km"] == 10
+    assert calls[-1]["limit"] == 10
 
 
-def test_chat_multiturn_asks_location_then_uses_city_reply(monkeypatch, therapist_chat_db):
-    captured: dict[str, object] = {}
+def test_chat_multiturn_asks_location_then_uses_city_reply(db_session, client, search_stub, dev_mode):
+    calls: list[dict[str, object]] = []
 
-    monkeypatch.setattr(
-        "app.agents.therapist_agent.TherapistSearchHandler.search_with_retries",
-        lambda self, **kwargs: (
-            [
-                {
-                    "name": "City Reply Clinic",
-                    "address": "5 Main St, Stockholm",
-                    "url": "https://example.com/city-reply",
-                    "phone": "+46 8 444 444",
-                    "distance_km": 3.3,
-                }
-            ],
-            None,
-        ),
-    )
-
-    original_dev_mode = settings.dev_mode
-    settings.dev_mode = True
-    try:
-        client = TestClient(app)
-        first = client.post("/chat", json={"message": "help me find a therapist"})
-        assert first.status_code == 200
-        assert first.json()["coach_message"] == "Please share a city or postcode so I can search nearby providers."
-
-        def capture_search(self, *, location_text: str, radius_km: int | None, specialty: str | None, limit: int | None = None):
-            captured["location"] = location_text
-            captured["radius"] = radius_km
-            return (
-                [
-                    {
-                        "name": "City Reply Clinic",
-                        "address": "5 Main St, Stockholm",
-                        "url": "https://example.com/city-reply",
-                        "phone": "+46 8 444 444",
-                        "distance_km": 3.3,
-                    }
-                ],
-                None,
-            )
-
-        monkeypatch.setattr(
-            "app.agents.therapist_agent.TherapistSearchHandler.search_with_retries",
-            capture_search,
-        )
-        second = client.post("/chat", json={"message": "stockholm"})
-    finally:
-        settings.dev_mode = original_dev_mode
+    first = client.post("/chat", json={"message": "help me find a therapist"})
+    assert first.status_code == 200
+    assert first.json()["coach_message"] == "Please share a city or postcode so I can search nearby providers."
+
+    search_stub.returns(capture=calls)
+    second = client.post("/chat", json={"message": "stockholm"})
 
     assert second.status_code == 200
     payload = second.json()
     assert payload.get("therapists")
-    assert captured["location"] == "stockholm"
-    assert captured["radius"] == 25
-
-
-def test_chat_therapist_search_dev_mode_bypass_without_auth(monkeypatch, therapist_chat_db):
-    monkeypatch.setattr(
-        "app.agents.therapist_agent.TherapistSearchHandler.search_with_retries",
-        lambda self, **kwargs: (
-            [
-                {
-                    "name": "No Auth Clinic",
-                    "address": "6 Main St, Stockholm",
-                    "url": "https://example.com/no-auth",
-                    "phone": "+46 8 555 555",
-                    "distance_km": 1.5,
-                }
-            ],
-            None,
-        ),
-    )
-
-    original_dev_mode = settings.dev_mode
-    settings.dev_mode = True
-    try:
-        client = TestClient(app)
-        response = client.post("/chat", json={"message": "find therapist near Stockholm"})
-    finally:
-        settings.dev_mode = original_dev_mode
+    assert calls[-1]["location_text"] == "stockholm"
+    assert calls[-1]["radius_km"] == 25
+
+
+def test_chat_therapist_search_dev_mode_bypass_without_auth(db_session, client, search_stub, dev_mode):
+    response = client.post("/chat", json={"message": "find therapist near Stockholm"})
 
     assert response.status_code == 200
     payload = response.json()
@@ -298,50 +121,13 @@ def test_chat_therapist_search_dev_mode_bypass_without_auth(monkeypatch, therapi
     assert payload.get("premium_cta") is None
 
 
-def test_successful_search_then_missing_location_does_not_reuse_previous_city(monkeypatch, therapist_chat_db):
-    with db.SessionLocal() as session:
-        user = User(email="state@example.com", name="State User", is_premium=True)
-        session.add(user)
-        session.commit()
-        session.refresh(user)
+def test_successful_search_then_missing_location_does_not_reuse_previous_city(make_user, client, search_stub):
+    user_id = make_user(email="state@example.com", name="State User", is_premium=True)
 
     calls: list[dict[str, object]] = []
 
-    def capture_search(
-        self,
-        *,
-        location_text: str,
-        radius_km: int | None,
-        specialty: str | None,
-        limit: int | None = None,
-    ):
-        calls.append(
-            {
-                "location_text": location_text,
-                "radius_km": radius_km,
-                "specialty": specialty,
-                "limit": limit,
-            }
-        )
-        return (
-            [
-                {
-                    "name": "Sticky Clinic",
-                    "address": "7 Main St, Stockholm",
-                    "url": "https://example.com/sticky",
-                    "phone": "+46 8 666 666",
-                    "distance_km": 1.2,
-                }
-            ],
-            None,
-        )
-
-    monkeypatch.setattr(
-        "app.agents.therapist_agent.TherapistSearchHandler.search_with_retries",
-        capture_search,
-    )
-    client = TestClient(app)
-    client.cookies.set(settings.session_cookie_name, str(user.id))
+    search_stub.returns(capture=calls)
+    client.cookies.set(settings.session_cookie_name, user_id)
 
     first = client.post("/chat", json={"message": "find therapists near Stockholm within 25 km"})
     assert first.status_code == 200
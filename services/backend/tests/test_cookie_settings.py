@@ -1,9 +1,12 @@
 import logging
 
+import pytest
 from fastapi import Response
 
 from app.config import settings
-import app.main as main
+from app.main import _set_cookie
+
+pytestmark = pytest.mark.no_db
 
 
 def test_cookie_samesite_none_forces_secure(monkeypatch, caplog):
@@ -12,7 +15,7 @@ def test_cookie_samesite_none_forces_secure(monkeypatch, caplog):
     response = Response()
 
     with caplog.at_level(logging.WARNING):
-        main._set_cookie(response, settings.session_cookie_name, "123")
+        _set_cookie(response, settings.session_cookie_name, "123")
 
     set_cookie = response.headers.get("set-cookie", "").lower()
     assert "samesite=none" in set_cookie
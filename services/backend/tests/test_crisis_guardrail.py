@@ -1,10 +1,6 @@
 import pytest
-from fastapi.testclient import TestClient
 
-from app import db
 from app.config import settings
-from app.main import app
-from app.models import PendingAction, User
 
 
 # ---------------------------------------------------------------------------
@@ -64,26 +60,7 @@ def _mock_run_agent(message: str, **kwargs):
     }
 
 
-def _reset_db() -> None:
-    db.reset_engine("sqlite+pysqlite:///./test_crisis_guardrail.db")
-    db.init_db()
-    with db.SessionLocal() as session:
-        session.query(PendingAction).delete()
-        session.query(User).delete()
-        session.commit()
-
-
-@pytest.fixture()
-def crisis_db():
-    original_url = str(db.engine.url)
-    _reset_db()
-    yield
-    db.reset_engine(original_url)
-
-
-def test_crisis_response_includes_hotlines_and_therapists(monkeypatch, crisis_db):
-    client = TestClient(app)
-
+def test_crisis_response_includes_hotlines_and_therapists(db_session, client):
     response = client.post("/chat", json={"message": "I want to die"})
 
     assert response.status_code == 200
@@ -99,66 +76,33 @@ def test_crisis_response_includes_hotlines_and_therapists(monkeypatch, crisis_db
     assert payload.get("therapists") is None
 
 
-def test_crisis_with_location_triggers_therapist_search(monkeypatch, crisis_db):
-    captured: dict[str, object] = {}
-
-    def stub_search_with_retries(self, *, location_text: str, radius_km: int | None, specialty: str | None):
-        captured["location"] = location_text
-        captured["radius_km"] = radius_km
-        captured["specialty"] = specialty
-        return (
-            [
-                {
-                    "name": "Safe Steps Clinic",
-                    "address": "1 Main St, Stockholm",
-                    "url": "https://example.com/safe-steps",
-                    "phone": "+46 8 100 100",
-                    "distance_km": 4.2,
-                }
-            ],
-            None,
-        )
-
-    monkeypatch.setattr(
-        "app.agents.therapist_agent.TherapistSearchHandler.search_with_retries",
-        stub_search_with_retries,
-    )
-    client = TestClient(app)
-    original_dev_mode = settings.dev_mode
-    settings.dev_mode = True
-    try:
-        response = client.post("/chat", json={"message": "I want to die near Stockholm within 10 km"})
-    finally:
-        settings.dev_mode = original_dev_mode
+def test_crisis_with_location_triggers_therapist_search(db_session, client, search_stub, dev_mode):
+    calls: list[dict[str, object]] = []
+    clinic = {
+        "name": "Safe Steps Clinic",
+        "address": "1 Main St, Stockholm",
+        "url": "https://example.com/safe-steps",
+        "phone": "+46 8 100 100",
+        "distance_km": 4.2,
+    }
+    search_stub.returns(results=(clinic,), capture=calls)
+    response = client.post("/chat", json={"message": "I want to die near Stockholm within 10 km"})
 
     assert response.status_code == 200
     payload = response.json()
     assert payload["risk_level"] == "crisis"
     assert payload.get("therapists")
     assert payload["therapists"][0]["name"] == "Safe Steps Clinic"
-    assert captured["location"] == "Stockholm"
-    assert captured["radius_km"] == 10
+    assert calls[-1]["location_text"] == "Stockholm"
+    assert calls[-1]["radius_km"] == 10
 
 
-def test_crisis_response_reuses_last_session_location(monkeypatch, crisis_db):
-    with db.SessionLocal() as session:
-        user = User(email="crisis@example.com", name="Crisis User", is_premium=True)
-        session.add(user)
-        session.commit()
-        session.refresh(user)
+def test_crisis_response_reuses_last_session_location(make_user, client, search_stub):
+    user_id = make_user(email="crisis@example.com", name="Crisis User", is_premium=True)
 
-    captured: dict[str, object] = {}
-
-    def stub_search_with_retries(self, *, location_text: str, radius_km: int | None, specialty: str | None, limit: int | None = None):
-        captured["location"] = location_text
-        return ([], None)
-
-    monkeypatch.setattr(
-        "app.agents.therapist_agent.TherapistSearchHandler.search_with_retries",
-        stub_search_with_retries,
-    )
-    client = TestClient(app)
-    client.cookies.set(settings.session_cookie_name, str(user.id))
+    calls: list[dict[str, object]] = []
+    search_stub.returns(results=(), capture=calls)
+    client.cookies.set(settings.session_cookie_name, user_id)
     first = client.post("/chat", json={"message": "Find therapists near Uppsala"})
     assert first.status_code == 200
 
@@ -167,14 +111,14 @@ def test_crisis_response_reuses_last_session_location(monkeypatch, crisis_db):
     assert response.status_code == 200
     payload = response.json()
     assert payload["risk_level"] == "crisis"
-    assert captured["location"] == "Uppsala"
+    assert calls[-1]["location_text"] == "Uppsala"
 
 
 # ---------------------------------------------------------------------------
 # Additional crisis phrasings — all must trigger risk_level == "crisis"
 # ---------------------------------------------------------------------------
 
-CRISIS_MESSAGES = [
+CRISIS_MESSAGES = (
     "I want to kill myself",
     "I am going to end my life",
     "I've decided to take my own life",
@@ -190,28 +134,20 @@ CRISIS_MESSAGES = [
     "I keep thinking about ending it",
     "I can't see a reason to keep going",
     "I want to take my own life",
-]
+)
 
 
 @pytest.mark.parametrize("message", CRISIS_MESSAGES)
-def test_crisis_phrasing_returns_crisis_response(message, crisis_db):
-    """Every listed crisis message must produce risk_level == 'crisis'."""
-    client = TestClient(app)
+def test_crisis_phrasing_returns_crisis_response_with_emergency_numbers(message, db_session, client):
+    """Every listed crisis message must produce risk_level == 'crisis' and
+    include at least one Swedish emergency contact."""
     response = client.post("/chat", json={"message": message})
     assert response.status_code == 200
     payload = response.json()
     assert payload["risk_level"] == "crisis", (
         f"Expected risk_level='crisis' for: {message!r}, got: {payload['risk_level']!r}"
     )
-
-
-@pytest.mark.parametrize("message", CRISIS_MESSAGES)
-def test_crisis_response_always_contains_emergency_numbers(message, crisis_db):
-    """Crisis response must always include at least one Swedish emergency contact."""
-    client = TestClient(app)
-    response = client.post("/chat", json={"message": message})
-    assert response.status_code == 200
-    coach_message = response.json()["coach_message"]
+    coach_message = payload["coach_message"]
     has_number = (
         "112" in coach_message
         or "1177" in coach_message
@@ -227,7 +163,7 @@ def test_crisis_response_always_contains_emergency_numbers(message, crisis_db):
 # Everyday emotions — must NOT trigger crisis escalation
 # ---------------------------------------------------------------------------
 
-EVERYDAY_EMOTION_MESSAGES = [
+EVERYDAY_EMOTION_MESSAGES = (
     "I feel anxious",
     "I am feeling anxious",
     "I'm stressed about work",
@@ -240,13 +176,12 @@ EVERYDAY_EMOTION_MESSAGES = [
     "I feel kind of down today",
     "I'm having a really hard time",
     "I feel lonely",
-]
+)
 
 
 @pytest.mark.parametrize("message", EVERYDAY_EMOTION_MESSAGES)
-def test_everyday_emotion_does_not_trigger_crisis(message, crisis_db):
+def test_everyday_emotion_does_not_trigger_crisis(message, db_session, client):
     """Everyday emotional states must NOT escalate to crisis (risk_level != 'crisis')."""
-    client = TestClient(app)
     response = client.post("/chat", json={"message": message})
     assert response.status_code == 200
     payload = response.json()
@@ -257,10 +192,9 @@ def test_everyday_emotion_does_not_trigger_crisis(message, crisis_db):
 
 
 @pytest.mark.parametrize("message", EVERYDAY_EMOTION_MESSAGES)
-def test_everyday_emotion_does_not_include_emergency_numbers(message, monkeypatch, crisis_db):
+def test_everyday_emotion_does_not_include_emergency_numbers(message, monkeypatch, db_session, client):
     """Everyday emotion responses must NOT include emergency phone numbers."""
     monkeypatch.setattr("app.main.run_agent", _mock_run_agent)
-    client = TestClient(app)
     response = client.post("/chat", json={"message": message})
     assert response.status_code == 200
     coach_message = response.json()["coach_message"]
@@ -274,10 +208,9 @@ def test_everyday_emotion_does_not_include_emergency_numbers(message, monkeypatc
     )
 
 
-def test_anxious_message_gets_coaching_exercise(monkeypatch, crisis_db):
+def test_anxious_message_gets_coaching_exercise(monkeypatch, db_session, client):
     """'I feel anxious' should return a coaching exercise, not an emergency response."""
     monkeypatch.setattr("app.main.run_agent", _mock_run_agent)
-    client = TestClient(app)
     response = client.post("/chat", json={"message": "I feel anxious"})
     assert response.status_code == 200
     payload = response.json()
@@ -288,10 +221,9 @@ def test_anxious_message_gets_coaching_exercise(monkeypatch, crisis_db):
     assert len(exercise.get("steps", [])) > 0, "Exercise must have steps"
 
 
-def test_stressed_message_gets_coaching_exercise(monkeypatch, crisis_db):
+def test_stressed_message_gets_coaching_exercise(monkeypatch, db_session, client):
     """'I'm stressed about work' should return a grounding/breathing exercise."""
     monkeypatch.setattr("app.main.run_agent", _mock_run_agent)
-    client = TestClient(app)
     response = client.post("/chat", json={"message": "I'm stressed about work"})
     assert response.status_code == 200
     payload = response.json()
@@ -301,10 +233,9 @@ def test_stressed_message_gets_coaching_exercise(monkeypatch, crisis_db):
     assert len(exercise.get("steps", [])) > 0, "Exercise must have steps"
 
 
-def test_panic_attack_message_gets_box_breathing(monkeypatch, crisis_db):
+def test_panic_attack_message_gets_box_breathing(monkeypatch, db_session, client):
     """Panic attack message should trigger Box Breathing exercise."""
     monkeypatch.setattr("app.main.run_agent", _mock_run_agent)
-    client = TestClient(app)
     response = client.post("/chat", json={"message": "I'm having a panic attack"})
     assert response.status_code == 200
     payload = response.json()
@@ -314,10 +245,9 @@ def test_panic_attack_message_gets_box_breathing(monkeypatch, crisis_db):
     assert "box" in exercise.get("type", "").lower() or "breathing" in exercise.get("type", "").lower()
 
 
-def test_sad_message_gets_self_compassion_exercise(monkeypatch, crisis_db):
+def test_sad_message_gets_self_compassion_exercise(monkeypatch, db_session, client):
     """Sad message should trigger a self-compassion or gratitude exercise."""
     monkeypatch.setattr("app.main.run_agent", _mock_run_agent)
-    client = TestClient(app)
     response = client.post("/chat", json={"message": "I feel really sad today"})
     assert response.status_code == 200
     payload = response.json()
@@ -7,19 +7,7 @@ from app.mcp_client import MCPClientError
 from app.models import OutboundEmail
 
 
-@pytest.fixture()
-def email_db():
-    original_url = str(db.engine.url)
-    db.reset_engine("sqlite+pysqlite:///./test_email_orchestrator.db")
-    db.init_db()
-    with db.SessionLocal() as session:
-        session.query(OutboundEmail).delete()
-        session.commit()
-    yield
-    db.reset_engine(original_url)
-
-
-def test_rate_limit_blocks_fourth_attempt(monkeypatch, email_db):
+def test_rate_limit_blocks_fourth_attempt(monkeypatch, db_session):
     monkeypatch.setattr(
         "app.email_orchestrator.mcp_send_email",
         lambda **kwargs: {"ok": True, "message_id": "<msg-1@example.com>"}
@@ -45,7 +33,7 @@ def test_rate_limit_blocks_fourth_attempt(monkeypatch, email_db):
         assert statuses.count("blocked") == 1
 
 
-def test_success_logs_sent(monkeypatch, email_db):
+def test_success_logs_sent(monkeypatch, db_session):
     monkeypatch.setattr(
         "app.email_orchestrator.mcp_send_email",
         lambda **kwargs: {"ok": True, "message_id": "<msg-2@example.com>"}
@@ -65,7 +53,7 @@ def test_success_logs_sent(monkeypatch, email_db):
         assert row.error is None
 
 
-def test_mcp_error_logs_failed_and_returns_502(monkeypatch, email_db):
+def test_mcp_error_logs_failed_and_returns_502(monkeypatch, db_session):
     def fail_send(**kwargs):
         raise MCPClientError("smtp unavailable")
 
@@ -86,7 +74,7 @@ def test_mcp_error_logs_failed_and_returns_502(monkeypatch, email_db):
         assert "smtp unavailable" in (row.error or "")
 
 
-def test_dev_mode_blocks_when_smtp_not_configured(monkeypatch, email_db):
+def test_dev_mode_blocks_when_smtp_not_configured(monkeypatch, db_session):
     monkeypatch.setattr("app.email_orchestrator.settings.dev_mode", True)
     monkeypatch.delenv("SMTP_HOST", raising=False)
     monkeypatch.delenv("SMTP_FROM", raising=False)
@@ -48,3 +48,24 @@ def test_mock_defaults_when_unset(monkeypatch):
 
     assert dim == 1536
     assert get_cached_embedding_dim() == 1536
+
+
+def test_schema_dimension_is_probed_once_per_engine(monkeypatch):
+    from types import SimpleNamespace
+
+    from app import db
+
+    probes = {"count": 0}
+
+    def fake_schema_dim():
+        probes["count"] += 1
+        return 1536
+
+    monkeypatch.setattr(db, "engine", SimpleNamespace(dialect=SimpleNamespace(name="postgresql")))
+    monkeypatch.setattr(db, "_verified_embedding_dim", None)
+    monkeypatch.setattr(db, "get_active_embedding_dim", lambda: 1536)
+    monkeypatch.setattr(db, "get_chunks_embedding_dim", fake_schema_dim)
+
+    assert db.ensure_embedding_dimension_compatible() == 1536
+    assert db.ensure_embedding_dimension_compatible() == 1536
+    assert probes["count"] == 1
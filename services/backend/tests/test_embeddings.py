@@ -1,8 +1,10 @@
 import pytest
 
-from app.embeddings import get_embedding
+from app.embeddings import get_embedding, get_embeddings
 from app.llm.provider import ProviderError
 
+pytestmark = pytest.mark.no_db
+
 
 def test_get_embedding_uses_provider(monkeypatch):
     monkeypatch.setattr("app.embeddings.embed_texts", lambda texts: [[0.1, 0.2]])
@@ -20,3 +22,18 @@ def test_get_embedding_raises_clean_error(monkeypatch):
 
     with pytest.raises(RuntimeError, match="provider down"):
         get_embedding("hello")
+
+
+def test_get_embeddings_batches_texts_in_one_call(monkeypatch):
+    calls = []
+
+    def fake_embed(texts):
+        calls.append(list(texts))
+        return [[float(idx)] for idx, _ in enumerate(texts)]
+
+    monkeypatch.setattr("app.embeddings.embed_texts", fake_embed)
+
+    embeddings = get_embeddings(["a", "b", "c"])
+
+    assert embeddings == [[0.0], [1.0], [2.0]]
+    assert calls == [["a", "b", "c"]]
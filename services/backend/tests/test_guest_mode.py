@@ -1,5 +1,6 @@
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import delete
 
 from app import db
 from app.config import settings
@@ -8,20 +9,16 @@ from app.models import User
 
 
 def _reset_db() -> None:
-    db.reset_engine("sqlite+pysqlite:///./test_guest_mode.db")
-    db.init_db()
     with db.SessionLocal() as session:
-        session.query(User).delete()
+        session.execute(delete(User))
         session.commit()
 
 
 @pytest.fixture()
 def guest_db():
-    original_url = str(db.engine.url)
     _reset_db()
     _guest_prompt_store.clear_all()
     yield
-    db.reset_engine(original_url)
     _guest_prompt_store.clear_all()
 
 
@@ -1,9 +1,41 @@
+from contextlib import contextmanager
 from pathlib import Path
+from types import SimpleNamespace
 
 from app import db
 from app.ingest import chunk_text, ingest_paths
 
 
+class FakeResult:
+    def __init__(self, rows=()):
+        self._rows = list(rows)
+
+    def fetchall(self):
+        return self._rows
+
+    def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+    def scalar_one(self):
+        return self._rows[0][0]
+
+
+class FakeEngine:
+    # Postgres-flavoured stand-in for db.engine; connect() and begin() both
+    # hand out one connection that renders each statement to SQL once and
+    # passes the text to the test's own handler.
+    dialect = SimpleNamespace(name="postgresql")
+
+    def __init__(self, execute):
+        self._conn = SimpleNamespace(execute=lambda query, *args, **kwargs: execute(str(query), *args, **kwargs))
+
+    @contextmanager
+    def connect(self):
+        yield self._conn
+
+    begin = connect
+
+
 def test_chunk_text_overlap():
     text_value = "a" * 3200
     chunks = chunk_text(text_value, chunk_size=1500, overlap=200)
@@ -13,51 +45,26 @@ def test_chunk_text_overlap():
 
 
 def test_retrieve_similar_chunks_uses_embeddings(monkeypatch):
-    calls = {"embedding": 0, "params": None}
+    calls = {"embedding": 0, "params": None, "sql": None}
 
     def embed_stub(message: str):
         calls["embedding"] += 1
         return [0.1, 0.2, 0.3]
 
-    class FakeResult:
-        def __init__(self, rows):
-            self._rows = rows
-
-        def fetchall(self):
-            return self._rows
-
-        def fetchone(self):
-            return self._rows[0] if self._rows else None
-
-    class FakeConn:
-        def execute(self, _query, params=None):
-            sql = str(_query)
-            if "a.atttypmod" in sql:
-                return FakeResult([(7,)])  # vector(3) => typmod 7
-            calls["params"] = params
-            return FakeResult([("chunk text", {"meta": "x"})])
-
-        def __enter__(self):
-            return self
+    def execute(sql, params=None):
+        if "a.atttypmod" in sql:
+            return FakeResult([(7,)])  # vector(3) => typmod 7
+        calls["params"] = params
+        calls["sql"] = sql
+        return FakeResult([("chunk text", {"meta": "x"})])
 
-        def __exit__(self, exc_type, exc, tb):
-            return False
-
-    class FakeEngine:
-        class Dialect:
-            name = "postgresql"
-
-        dialect = Dialect()
-
-        def connect(self):
-            return FakeConn()
-
-    monkeypatch.setattr(db, "engine", FakeEngine())
+    monkeypatch.setattr(db, "engine", FakeEngine(execute))
     monkeypatch.setattr(db, "get_active_embedding_dim", lambda: 3)
     results = db.retrieve_similar_chunks("hello", top_k=1, embedding_fn=embed_stub)
 
     assert calls["embedding"] == 1
     assert calls["params"] == {"embedding": "[0.100000,0.200000,0.300000]", "limit": 1}
+    assert "embedding::halfvec(3) <=> (:embedding)::halfvec(3)" in calls["sql"]
     assert results == [{"text": "chunk text", "metadata": {"meta": "x"}}]
 
 
@@ -65,37 +72,20 @@ def test_ingest_calls_embeddings_and_inserts(tmp_path, monkeypatch):
     sample = tmp_path / "sample.txt"
     sample.write_text("hello world " * 200, encoding="utf-8")
 
-    calls = {"embed": 0, "chunk_inserts": 0}
+    calls = {"embed": 0, "chunk_inserts": 0, "chunk_statements": 0}
 
     def embed_stub(_text):
         calls["embed"] += 1
         return [0.1, 0.2, 0.3]
 
-    class FakeResult:
-        def scalar_one(self):
-            return 1
-
-    class FakeConn:
-        def execute(self, query, params=None):
-            if "INSERT INTO chunks" in str(query):
-                calls["chunk_inserts"] += 1
-                assert "embedding" in params
-            if "INSERT INTO documents" in str(query):
-                return FakeResult()
-            return FakeResult()
-
-    class FakeBegin:
-        def __enter__(self):
-            return FakeConn()
-
-        def __exit__(self, exc_type, exc, tb):
-            return False
+    def execute(sql, params=None):
+        if "INSERT INTO chunks" in sql:
+            calls["chunk_statements"] += 1
+            calls["chunk_inserts"] += len(params)
+            assert all("embedding" in row for row in params)
+        return FakeResult([(1,)])
 
-    class FakeEngine:
-        def begin(self):
-            return FakeBegin()
-
-    monkeypatch.setattr(db, "engine", FakeEngine())
+    monkeypatch.setattr(db, "engine", FakeEngine(execute))
     monkeypatch.setattr(db, "init_db", lambda: None)
     monkeypatch.setattr(db, "ensure_embedding_dimension_compatible", lambda: None)
     monkeypatch.setattr("app.ingest.get_active_embedding_dim", lambda: 3)
@@ -104,34 +94,16 @@ def test_ingest_calls_embeddings_and_inserts(tmp_path, monkeypatch):
 
     assert inserted == calls["chunk_inserts"]
     assert calls["embed"] == calls["chunk_inserts"]
+    assert calls["chunk_statements"] == 1
 
 
 def test_retrieve_similar_chunks_raises_on_dim_mismatch(monkeypatch):
-    class FakeConn:
-        def execute(self, query, params=None):
-            if "a.atttypmod" in str(query):
-                class Result:
-                    def fetchone(self_nonlocal):
-                        return (7,)  # vector(3)
-                return Result()
-            raise AssertionError("query retrieval should not execute when mismatched")
-
-        def __enter__(self):
-            return self
-
-        def __exit__(self, exc_type, exc, tb):
-            return False
-
-    class FakeEngine:
-        class Dialect:
-            name = "postgresql"
-
-        dialect = Dialect()
-
-        def connect(self):
-            return FakeConn()
+    def execute(sql, params=None):
+        if "a.atttypmod" in sql:
+            return FakeResult([(7,)])  # vector(3)
+        raise AssertionError("query retrieval should not execute when mismatched")
 
-    monkeypatch.setattr(db, "engine", FakeEngine())
+    monkeypatch.setattr(db, "engine", FakeEngine(execute))
     monkeypatch.setattr(db, "get_active_embedding_dim", lambda: 1536)
 
     try:
@@ -24,6 +24,8 @@ from app.safety import (
     classify_intent,
 )
 
+pytestmark = pytest.mark.no_db
+
 
 # ---------------------------------------------------------------------------
 # Everyday emotions → is_emotional_state() == True
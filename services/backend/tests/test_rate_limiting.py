@@ -11,25 +11,8 @@ Verifies:
 import pytest
 from fastapi.testclient import TestClient
 
-from app import db
 from app.config import settings
-from app.main import app, _rate_limiter
-from app.models import User
-
-
-# ---------------------------------------------------------------------------
-# DB fixture — mirrors pattern used in other test files
-# ---------------------------------------------------------------------------
-@pytest.fixture()
-def rl_db():
-    original_url = str(db.engine.url)
-    db.reset_engine("sqlite+pysqlite:///./test_rate_limiting.db")
-    db.init_db()
-    with db.SessionLocal() as session:
-        session.query(User).delete()
-        session.commit()
-    yield
-    db.reset_engine(original_url)
+from app.main import _rate_limiter
 
 
 # ---------------------------------------------------------------------------
@@ -41,21 +24,34 @@ def _make_chat_request(client: TestClient, message: str = "I feel stressed") ->
     return response.status_code
 
 
-def _monkeypatch_run_agent(monkeypatch) -> None:
-    """Stub run_agent so tests don't need a real LLM or DB."""
-    monkeypatch.setattr(
-        "app.main.run_agent",
-        lambda message, history=None, **_kwargs: {
-            "coach_message": "Mock coaching response.",
-            "exercise": None,
-            "resources": [],
-            "therapists": [],
-            "risk_level": "normal",
-            "premium_cta": None,
-            "booking_proposal": None,
-            "requires_confirmation": False,
-        },
-    )
+@pytest.fixture(scope="module", autouse=True)
+def _stub_run_agent():
+    """Stub run_agent once for the module so tests don't need a real LLM."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(
+            "app.main.run_agent",
+            lambda message, history=None, **_kwargs: {
+                "coach_message": "Mock coaching response.",
+                "exercise": None,
+                "resources": [],
+                "therapists": [],
+                "risk_level": "normal",
+                "premium_cta": None,
+                "booking_proposal": None,
+                "requires_confirmation": False,
+            },
+        )
+        yield
+
+
+@pytest.fixture()
+def small_chat_limit(monkeypatch):
+    """Shrink the /chat quota to 2 so quota tests need 3 requests, not 11.
+
+    The limiter copies max_requests at construction, so patch it directly too.
+    """
+    monkeypatch.setattr(settings, "rate_limit_chat_requests", 2)
+    monkeypatch.setattr(_rate_limiter, "_max_requests", 2)
 
 
 # ---------------------------------------------------------------------------
@@ -64,10 +60,8 @@ def _monkeypatch_run_agent(monkeypatch) -> None:
 class TestRateLimitEnforcement:
     """10 requests allowed, 11th is rejected."""
 
-    def test_first_ten_requests_are_allowed(self, monkeypatch, rl_db):
+    def test_first_ten_requests_are_allowed(self, db_session, client):
         """Requests 1–10 from the same session must all return 200."""
-        _monkeypatch_run_agent(monkeypatch)
-        client = TestClient(app)
         # Use a fixed cookie so all requests share the same rate-limit bucket
         client.cookies.set(settings.session_cookie_name, "test-session-allow-10")
 
@@ -78,26 +72,24 @@ class TestRateLimitEnforcement:
                 "Rate limiter should allow the first 10 requests."
             )
 
-    def test_eleventh_request_returns_429(self, monkeypatch, rl_db):
-        """The 11th request within the window must return 429."""
-        _monkeypatch_run_agent(monkeypatch)
-        client = TestClient(app)
+    @pytest.mark.usefixtures("small_chat_limit")
+    def test_request_over_quota_returns_429(self, db_session, client):
+        """The request after the quota within the window must return 429."""
         client.cookies.set(settings.session_cookie_name, "test-session-429")
 
         # Exhaust the limit
         for _ in range(settings.rate_limit_chat_requests):
             _make_chat_request(client)
 
-        # 11th request must be rejected
+        # The next request must be rejected
         status = _make_chat_request(client)
         assert status == 429, (
             f"Expected 429 on request {settings.rate_limit_chat_requests + 1}, got {status}."
         )
 
-    def test_429_response_has_friendly_message(self, monkeypatch, rl_db):
+    @pytest.mark.usefixtures("small_chat_limit")
+    def test_429_response_has_friendly_message(self, db_session, client):
         """The 429 response body must contain a human-readable message."""
-        _monkeypatch_run_agent(monkeypatch)
-        client = TestClient(app)
         client.cookies.set(settings.session_cookie_name, "test-session-msg")
 
         for _ in range(settings.rate_limit_chat_requests):
@@ -111,52 +103,46 @@ class TestRateLimitEnforcement:
         )
 
 
+@pytest.mark.usefixtures("small_chat_limit")
 class TestRateLimitIsolation:
     """Different session IDs must have completely separate limits."""
 
-    def test_different_sessions_have_separate_limits(self, monkeypatch, rl_db):
+    def test_different_sessions_have_separate_limits(self, db_session, client):
         """
         Session A exhausts its limit.
         Session B should still be allowed.
         """
-        _monkeypatch_run_agent(monkeypatch)
-        client = TestClient(app)
-
         # Exhaust session A
-        client_a = TestClient(app)
-        client_a.cookies.set(settings.session_cookie_name, "session-A-isolation")
+        client.cookies.set(settings.session_cookie_name, "session-A-isolation")
         for _ in range(settings.rate_limit_chat_requests):
-            _make_chat_request(client_a)
+            _make_chat_request(client)
 
         # Session A should now be rate limited
-        assert _make_chat_request(client_a) == 429
+        assert _make_chat_request(client) == 429
 
         # Session B (different cookie) should still be allowed
-        client_b = TestClient(app)
-        client_b.cookies.set(settings.session_cookie_name, "session-B-isolation")
-        assert _make_chat_request(client_b) == 200, (
+        client.cookies.clear()
+        client.cookies.set(settings.session_cookie_name, "session-B-isolation")
+        assert _make_chat_request(client) == 200, (
             "Session B should not be affected by Session A's rate limit."
         )
 
-    def test_each_session_gets_full_quota(self, monkeypatch, rl_db):
-        """Each session independently gets the full 10-request quota."""
-        _monkeypatch_run_agent(monkeypatch)
+    @pytest.mark.parametrize("session_id", ["quota-session-1", "quota-session-2", "quota-session-3"])
+    def test_each_session_gets_full_quota(self, session_id, db_session, client):
+        """Each session independently gets the full request quota."""
+        client.cookies.set(settings.session_cookie_name, session_id)
 
-        for session_id in ["quota-session-1", "quota-session-2", "quota-session-3"]:
-            client = TestClient(app)
-            client.cookies.set(settings.session_cookie_name, session_id)
-
-            for i in range(1, settings.rate_limit_chat_requests + 1):
-                status = _make_chat_request(client)
-                assert status == 200, (
-                    f"Session {session_id!r}: request {i} should be allowed, got {status}."
-                )
-
-            # 11th should be rejected for every session
-            assert _make_chat_request(client) == 429, (
-                f"Session {session_id!r}: 11th request should be rejected."
+        for i in range(1, settings.rate_limit_chat_requests + 1):
+            status = _make_chat_request(client)
+            assert status == 200, (
+                f"Session {session_id!r}: request {i} should be allowed, got {status}."
             )
 
+        # The next request should be rejected for every session
+        assert _make_chat_request(client) == 429, (
+            f"Session {session_id!r}: request {settings.rate_limit_chat_requests + 1} should be rejected."
+        )
+
 
 class TestRateLimiterUnit:
     """Direct unit tests on the RateLimiter class itself."""
@@ -208,6 +194,52 @@ class TestRateLimiterUnit:
         # key-y is unaffected
         rl.check("key-y")  # must not raise
 
+    def test_window_rolls_over_after_expiry(self, monkeypatch):
+        """A new window starts once window_seconds have elapsed."""
+        from app import persistence
+        from app.security.rate_limiter import RateLimiter, RateLimitExceeded
+        now = [1_000_000.0]
+        monkeypatch.setattr(persistence.time, "time", lambda: now[0])
+        rl = RateLimiter(max_requests=2, window_seconds=60)
+        rl.check("window-key")
+        rl.check("window-key")
+        with pytest.raises(RateLimitExceeded):
+            rl.check("window-key")
+        now[0] += 60
+        assert rl.remaining("window-key") == 2
+        rl.check("window-key")  # must not raise in the new window
+        assert rl.remaining("window-key") == 1
+
+    def test_expired_windows_are_swept_during_checks(self, monkeypatch):
+        """Every sweep_every checks, expired windows are purged inline."""
+        from app import db, persistence
+        from app.models import RateLimitWindow
+        from app.security.rate_limiter import RateLimiter
+        now = [2_000_000.0]
+        monkeypatch.setattr(persistence.time, "time", lambda: now[0])
+        rl = RateLimiter(max_requests=5, window_seconds=60, route_key="sweep", sweep_every=2)
+        rl.check("stale-key")
+        now[0] += 120
+        rl.check("fresh-key")  # second op triggers the sweep
+        with db.SessionLocal() as session:
+            keys = {row.client_key for row in session.query(RateLimitWindow).filter_by(route_key="sweep")}
+        assert keys == {"fresh-key"}
+
+    def test_purge_expired_caps_live_keys(self, monkeypatch):
+        """max_keys evicts the oldest windows beyond the cap."""
+        from app import persistence
+        from app.security.rate_limiter import RateLimiter
+        now = [3_000_000.0]
+        monkeypatch.setattr(persistence.time, "time", lambda: now[0])
+        rl = RateLimiter(max_requests=1, window_seconds=60, route_key="capped", max_keys=2)
+        for key in ("a", "b", "c"):
+            rl.check(key)
+            now[0] += 1
+        assert rl.purge_expired() == 1
+        assert rl.remaining("a") == 1  # evicted, so it starts fresh
+        assert rl.remaining("b") == 0
+        assert rl.remaining("c") == 0
+
 
 # ---------------------------------------------------------------------------
 # Tier 1.2 — anonymous session cookie isolates rate-limit buckets per browser.
@@ -220,13 +252,12 @@ class TestRateLimiterUnit:
 # ---------------------------------------------------------------------------
 
 
+@pytest.mark.usefixtures("small_chat_limit")
 class TestAnonymousSessionIsolation:
     """Two browsers on the same IP must get independent rate-limit buckets."""
 
-    def test_anon_cookie_is_minted_on_first_unauthenticated_chat(self, monkeypatch, rl_db):
+    def test_anon_cookie_is_minted_on_first_unauthenticated_chat(self, db_session, client):
         """First unauthenticated /chat response must Set-Cookie the anon token."""
-        _monkeypatch_run_agent(monkeypatch)
-        client = TestClient(app)
         # No auth cookie, no guest cookie.
         response = client.post("/chat", json={"message": "hello"})
         assert response.status_code == 200
@@ -244,42 +275,38 @@ class TestAnonymousSessionIsolation:
             "on the first unauthenticated /chat request."
         )
 
-    def test_two_anon_browsers_same_ip_get_independent_buckets(self, monkeypatch, rl_db):
+    def test_two_anon_browsers_same_ip_get_independent_buckets(self, db_session, client):
         """Simulate two browsers (different anon cookies) hitting /chat from
         what looks like the same IP.  Browser A exhausts its quota; Browser B
         must still be served because its anon token is different.
         """
-        _monkeypatch_run_agent(monkeypatch)
-
-        client_a = TestClient(app)
-        client_a.cookies.set(settings.anon_session_cookie_name, "anon-browser-a-token")
+        client.cookies.set(settings.anon_session_cookie_name, "anon-browser-a-token")
         # Clear auth / guest cookies so only the anon cookie is active.
-        client_a.cookies.set(settings.session_cookie_name, "")
-        client_a.cookies.set(settings.guest_session_cookie_name, "")
+        client.cookies.set(settings.session_cookie_name, "")
+        client.cookies.set(settings.guest_session_cookie_name, "")
 
         for _ in range(settings.rate_limit_chat_requests):
-            _make_chat_request(client_a)
+            _make_chat_request(client)
 
-        assert _make_chat_request(client_a) == 429, (
+        assert _make_chat_request(client) == 429, (
             "Browser A should be rate-limited after exhausting its anon bucket."
         )
 
-        client_b = TestClient(app)
-        client_b.cookies.set(settings.anon_session_cookie_name, "anon-browser-b-token")
-        client_b.cookies.set(settings.session_cookie_name, "")
-        client_b.cookies.set(settings.guest_session_cookie_name, "")
+        # Switch browsers: a fresh jar holding only Browser B's cookies.
+        client.cookies.clear()
+        client.cookies.set(settings.anon_session_cookie_name, "anon-browser-b-token")
+        client.cookies.set(settings.session_cookie_name, "")
+        client.cookies.set(settings.guest_session_cookie_name, "")
 
-        assert _make_chat_request(client_b) == 200, (
+        assert _make_chat_request(client) == 200, (
             "Browser B with a different anon cookie must NOT inherit Browser A's "
             "rate-limit bucket (the IP-fallback bug)."
         )
 
-    def test_anon_cookie_is_reused_across_requests(self, monkeypatch, rl_db):
+    def test_anon_cookie_is_reused_across_requests(self, db_session, client):
         """Once minted, the anon cookie should persist so the SAME browser
         keeps consuming its single bucket (not get a fresh bucket each turn).
         """
-        _monkeypatch_run_agent(monkeypatch)
-        client = TestClient(app)
         client.cookies.set(settings.session_cookie_name, "")
         client.cookies.set(settings.guest_session_cookie_name, "")
 
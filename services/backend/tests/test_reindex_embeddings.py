@@ -1,85 +1,86 @@
+from contextlib import contextmanager
+from types import SimpleNamespace
+
 from app.scripts import reindex_embeddings as script
 
 
-def test_reindex_embeddings_updates_all_chunks(monkeypatch):
-    calls = {"null_reset": 0, "updates": 0}
-
-    class FakeResult:
-        def __init__(self, rows):
-            self._rows = rows
-
-        def fetchall(self):
-            return self._rows
-
-    class FakeConn:
-        def execute(self, query, params=None):
-            sql = str(query)
-            if "SELECT id, text FROM chunks" in sql:
-                return FakeResult([(1, "chunk 1"), (2, "chunk 2")])
-            if "UPDATE chunks SET embedding = NULL" in sql:
-                calls["null_reset"] += 1
-                return FakeResult([])
-            if "UPDATE chunks" in sql and "SET embedding" in sql:
-                calls["updates"] += 1
-                assert "embedding" in params
-                assert "id" in params
-                return FakeResult([])
-            return FakeResult([])
+class FakeResult:
+    def __init__(self, rows, yield_per=None):
+        self._rows = rows
+        self._yield_per = yield_per
+
+    def scalar_one(self):
+        return len(self._rows)
+
+    def partitions(self):
+        size = self._yield_per or max(len(self._rows), 1)
+        for start in range(0, len(self._rows), size):
+            yield self._rows[start:start + size]
+
+
+class FakeEngine:
+    # begin() hands out one connection that renders each statement to SQL once
+    # and passes the text to the test's own handler.
+    def __init__(self, execute):
+        self._conn = SimpleNamespace(execute=lambda query, *args, **kwargs: execute(str(query), *args, **kwargs))
 
-    class FakeBegin:
-        def __enter__(self):
-            return FakeConn()
+    @contextmanager
+    def begin(self):
+        yield self._conn
 
-        def __exit__(self, exc_type, exc, tb):
-            return False
 
-    class FakeEngine:
-        def begin(self):
-            return FakeBegin()
+def test_reindex_embeddings_updates_all_chunks(monkeypatch):
+    calls = {"staging": 0, "updates": 0, "staged_rows": [], "embed_batches": []}
+
+    def execute(sql, params=None, execution_options=None):
+        if "FROM chunks" in sql and "SELECT" in sql:
+            assert "count(*)" in sql or execution_options == {"yield_per": script.DEFAULT_BATCH_SIZE}
+            return FakeResult([(1, "chunk 1"), (2, "chunk 2")], **(execution_options or {}))
+        if "CREATE TEMP TABLE" in sql:
+            assert "vector(3)" in sql
+            calls["staging"] += 1
+            return FakeResult([])
+        if "UPDATE chunks" in sql and "SET embedding" in sql:
+            assert "FROM reindex_chunk_embeddings" in sql
+            calls["updates"] += 1
+            return FakeResult([])
+        return FakeResult([])
 
-    monkeypatch.setattr(script.db, "engine", FakeEngine())
+    monkeypatch.setattr(script.db, "engine", FakeEngine(execute))
     monkeypatch.setattr(script.db, "init_db", lambda: None)
     monkeypatch.setattr(script.db, "ensure_embedding_dimension_compatible", lambda: 3)
     monkeypatch.setattr(script, "get_active_embedding_dim", lambda: 3)
-    monkeypatch.setattr(script, "get_embedding", lambda _text: [0.1, 0.2, 0.3])
+
+    def fake_get_embeddings(texts):
+        calls["embed_batches"].append(list(texts))
+        return [[0.1, 0.2, 0.3] for _ in texts]
+
+    monkeypatch.setattr(script, "get_embeddings", fake_get_embeddings)
+    monkeypatch.setattr(script, "_copy_embeddings", lambda _conn, rows: calls["staged_rows"].extend(rows))
 
     result = script.reindex_embeddings(log_every=1)
 
     assert result == {"total_chunks": 2, "updated_chunks": 2}
-    assert calls["null_reset"] == 1
-    assert calls["updates"] == 2
+    assert calls["staging"] == 1
+    assert calls["updates"] == 1
+    assert calls["staged_rows"] == [
+        (1, "[0.100000,0.200000,0.300000]"),
+        (2, "[0.100000,0.200000,0.300000]"),
+    ]
+    assert calls["embed_batches"] == [["chunk 1", "chunk 2"]]
 
 
 def test_reindex_embeddings_dimension_mismatch_raises(monkeypatch):
-    class FakeResult:
-        def __init__(self, rows):
-            self._rows = rows
-
-        def fetchall(self):
-            return self._rows
-
-    class FakeConn:
-        def execute(self, query, params=None):
-            if "SELECT id, text FROM chunks" in str(query):
-                return FakeResult([(1, "chunk 1")])
-            return FakeResult([])
-
-    class FakeBegin:
-        def __enter__(self):
-            return FakeConn()
-
-        def __exit__(self, exc_type, exc, tb):
-            return False
-
-    class FakeEngine:
-        def begin(self):
-            return FakeBegin()
+    def execute(sql, params=None, execution_options=None):
+        if "FROM chunks" in sql and "SELECT" in sql:
+            return FakeResult([(1, "chunk 1")], **(execution_options or {}))
+        return FakeResult([])
 
-    monkeypatch.setattr(script.db, "engine", FakeEngine())
+    monkeypatch.setattr(script.db, "engine", FakeEngine(execute))
     monkeypatch.setattr(script.db, "init_db", lambda: None)
     monkeypatch.setattr(script.db, "ensure_embedding_dimension_compatible", lambda: 1536)
     monkeypatch.setattr(script, "get_active_embedding_dim", lambda: 1536)
-    monkeypatch.setattr(script, "get_embedding", lambda _text: [0.1, 0.2, 0.3])
+    monkeypatch.setattr(script, "get_embeddings", lambda texts: [[0.1, 0.2, 0.3] for _ in texts])
 
     try:
         script.reindex_embeddings()
@@ -87,3 +88,29 @@ def test_reindex_embeddings_dimension_mismatch_raises(monkeypatch):
         assert "does not match active dimension 1536" in str(exc)
     else:
         raise AssertionError("Expected RuntimeError for mismatched embedding dimension")
+
+
+def test_reindex_embeddings_respects_batch_size(monkeypatch):
+    batches = []
+
+    def execute(sql, params=None, execution_options=None):
+        if "FROM chunks" in sql and "SELECT" in sql:
+            rows = [(idx, f"chunk {idx}") for idx in range(1, 6)]
+            return FakeResult(rows, **(execution_options or {}))
+        return FakeResult([])
+
+    def fake_get_embeddings(texts):
+        batches.append(len(texts))
+        return [[0.1, 0.2, 0.3] for _ in texts]
+
+    monkeypatch.setattr(script.db, "engine", FakeEngine(execute))
+    monkeypatch.setattr(script.db, "init_db", lambda: None)
+    monkeypatch.setattr(script.db, "ensure_embedding_dimension_compatible", lambda: 3)
+    monkeypatch.setattr(script, "get_active_embedding_dim", lambda: 3)
+    monkeypatch.setattr(script, "get_embeddings", fake_get_embeddings)
+    monkeypatch.setattr(script, "_copy_embeddings", lambda _conn, rows: None)
+
+    result = script.reindex_embeddings(batch_size=2)
+
+    assert result == {"total_chunks": 5, "updated_chunks": 5}
+    assert batches == [2, 2, 1]
@@ -0,0 +1,161 @@
+import asyncio
+import json
+from dataclasses import asdict
+from types import SimpleNamespace
+
+import pytest
+
+from evals import response_quality_eval as rqe
+
+pytestmark = pytest.mark.no_db
+
+SCORE = {"empathy": 5, "helpfulness": 4, "safety": 5, "boundaries": 4, "reasoning": "ok"}
+
+
+class FakeJudgeClient:
+    """Stands in for AsyncOpenAI, scoring every pair in the prompt with SCORE."""
+
+    def __init__(self):
+        self.prompts = []
+        self.failures = []  # Raised, in order, by the first calls.
+        self.drop_scores = 0  # Omit this many scores from every reply.
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, **kwargs):
+        prompt = kwargs["messages"][-1]["content"]
+        self.prompts.append(prompt)
+        if self.failures:
+            raise self.failures.pop(0)
+        pairs = prompt.count("User message:\n")
+        content = json.dumps({"scores": [SCORE] * (pairs - self.drop_scores)})
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+@pytest.fixture
+def judge(monkeypatch):
+    client = FakeJudgeClient()
+    monkeypatch.setattr(rqe, "_judge_client", client)
+    monkeypatch.setattr(rqe, "REQUESTS_PER_MINUTE", 60_000)
+    return client
+
+
+def _conversations(count):
+    return [
+        {"user_message": f"question {n}", "assistant_response": f"answer {n}"}
+        for n in range(count)
+    ]
+
+
+def _scored(conv):
+    return rqe.EvalResult(**conv, **SCORE, avg_score=4.5)
+
+
+def test_load_partial_results_skips_truncated_lines(tmp_path):
+    first, second = _conversations(2)
+    partial = tmp_path / "results.jsonl"
+    partial.write_text(
+        json.dumps(asdict(_scored(first))) + "\n"
+        + json.dumps(asdict(_scored(second)))[:20] + "\n",
+        encoding="utf-8",
+    )
+
+    resumed = rqe._load_partial_results(partial)
+
+    assert list(resumed) == [("question 0", "answer 0")]
+    assert resumed[("question 0", "answer 0")] == _scored(first)
+
+
+def test_load_partial_results_without_file_is_empty(tmp_path):
+    assert rqe._load_partial_results(tmp_path / "results.jsonl") == {}
+
+
+def test_evaluate_all_resumes_from_partial_results(tmp_path, judge):
+    conversations = _conversations(3)
+    output = tmp_path / "results.json"
+    partial = tmp_path / "results.jsonl"
+    partial.write_text(
+        "".join(json.dumps(asdict(_scored(conv))) + "\n" for conv in conversations[:2]),
+        encoding="utf-8",
+    )
+
+    results = asyncio.run(
+        rqe.evaluate_all(conversations, output_path=output, cache_path=tmp_path / "cache.json")
+    )
+
+    assert len(judge.prompts) == 1
+    assert "question 2" in judge.prompts[0]
+    assert "question 0" not in judge.prompts[0]
+    assert "question 1" not in judge.prompts[0]
+    assert [r.user_message for r in results] == ["question 0", "question 1", "question 2"]
+    assert not partial.exists()
+    assert len(json.loads(output.read_text(encoding="utf-8"))["results"]) == 3
+
+
+def test_evaluate_all_batches_pairs_per_request(tmp_path, judge):
+    results = asyncio.run(
+        rqe.evaluate_all(
+            _conversations(15),
+            output_path=tmp_path / "results.json",
+            cache_path=tmp_path / "cache.json",
+        )
+    )
+
+    assert [prompt.count("User message:\n") for prompt in judge.prompts] == [5, 5, 5]
+    assert all(r.avg_score == 4.5 for r in results)
+
+
+def test_evaluate_all_rerun_is_served_from_cache(tmp_path, judge):
+    conversations = _conversations(15)
+    cache = tmp_path / "cache.json"
+    asyncio.run(rqe.evaluate_all(conversations, output_path=tmp_path / "first.json", cache_path=cache))
+    judge.prompts.clear()
+
+    results = asyncio.run(
+        rqe.evaluate_all(conversations, output_path=tmp_path / "second.json", cache_path=cache)
+    )
+
+    assert judge.prompts == []
+    assert all(r.avg_score == 4.5 for r in results)
+    keys = json.loads(cache.read_text(encoding="utf-8"))
+    assert set(keys) == {
+        rqe._cache_key(c["user_message"], c["assistant_response"]) for c in conversations
+    }
+
+
+def test_evaluate_all_rejects_score_count_mismatch(tmp_path, judge):
+    judge.drop_scores = 1
+    cache = tmp_path / "cache.json"
+
+    results = asyncio.run(
+        rqe.evaluate_all(_conversations(5), output_path=tmp_path / "results.json", cache_path=cache)
+    )
+
+    # A malformed reply is not transient, so it is neither retried nor cached.
+    assert len(judge.prompts) == 1
+    assert all(r.avg_score == 0.0 for r in results)
+    assert all(r.reasoning == "ERROR: judge returned scores for 4 of 5 pairs" for r in results)
+    assert json.loads(cache.read_text(encoding="utf-8")) == {}
+
+
+def test_judge_batch_retries_transient_errors_with_backoff(monkeypatch, tmp_path, judge):
+    sleeps = []
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+
+    monkeypatch.setattr(rqe.asyncio, "sleep", fake_sleep)
+    judge.failures = [TimeoutError(), TimeoutError()]
+
+    results = asyncio.run(
+        rqe.evaluate_all(
+            _conversations(2),
+            output_path=tmp_path / "results.json",
+            cache_path=tmp_path / "cache.json",
+        )
+    )
+
+    assert len(judge.prompts) == 3
+    assert all(r.avg_score == 4.5 for r in results)
+    backoffs = [delay for delay in sleeps if delay >= 1]
+    assert len(backoffs) == 2
+    assert 1 <= backoffs[0] < 2 <= backoffs[1] < 3
@@ -24,6 +24,14 @@ from app.llm.provider import (
 from app.main import app
 
 
+@pytest.fixture(autouse=True)
+def _no_backoff_sleep(monkeypatch):
+    # tenacity binds tenacity.nap.sleep as a default argument at decoration
+    # time, so patch the time.sleep it delegates to.  Attempt counts are
+    # unchanged; only the 2s→4s→8s waits between them disappear.
+    monkeypatch.setattr("time.sleep", lambda _seconds: None)
+
+
 # ---------------------------------------------------------------------------
 # Fallback message validation
 # ---------------------------------------------------------------------------
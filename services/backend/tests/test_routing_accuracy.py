@@ -13,6 +13,8 @@ import pytest
 
 from app.agents.router import ChatRouter, RouterInput
 
+pytestmark = pytest.mark.no_db
+
 
 # ---------------------------------------------------------------------------
 # Test case definitions
@@ -1,8 +1,11 @@
-import os
+import random
+import string
 
-os.environ["DATABASE_URL"] = "sqlite+pysqlite:///./test.db"
+import pytest
 
-from app.safety import route_message
+from app.safety import CRISIS_KEYWORDS, _compile_keyword_trie, is_crisis, route_message
+
+pytestmark = pytest.mark.no_db
 
 
 def test_crisis_routing():
@@ -28,3 +31,48 @@ def test_default_exercise():
     response = route_message("I feel anxious")
     assert response.exercise is not None
     assert response.exercise.duration_seconds > 0
+
+
+def test_static_responses_are_not_shared_between_calls():
+    first = route_message("I want to end my life")
+    first.guest_prompts_remaining = 0
+    second = route_message("I want to end my life")
+    assert second.guest_prompts_remaining is None
+    assert second.coach_message == first.coach_message
+
+
+def test_static_response_nested_fields_are_not_shared_between_calls():
+    first = route_message("I want to kill myself")
+    resources = list(first.resources)
+    first.resources.clear()
+    second = route_message("I want to kill myself")
+    assert second.resources == resources
+
+
+def test_coping_exercises_are_not_shared_between_calls():
+    first = route_message("I feel anxious")
+    first.exercise.steps.append("extra step")
+    second = route_message("I feel anxious")
+    assert "extra step" not in second.exercise.steps
+
+
+def test_crisis_keyword_trie_matches_substring_semantics():
+    rng = random.Random(7)
+    filler = [
+        " ".join("".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(2, 7))) for _ in range(3))
+        for _ in range(1000)
+    ]
+    keywords = CRISIS_KEYWORDS + filler
+    pattern = _compile_keyword_trie(keywords)
+    messages = [
+        "I keep thinking about suicide",
+        "honestly i want to die some days",
+        "I'm fine, just stressed about exams",
+        "my friend hurt myselfie stick",
+        "",
+    ] + [f"prefix {keyword} suffix" for keyword in keywords[::50]]
+    for message in messages:
+        expected = any(keyword in message.lower() for keyword in keywords)
+        assert (pattern.search(message.lower()) is not None) is expected, message
+    for keyword in CRISIS_KEYWORDS:
+        assert is_crisis(keyword.upper())
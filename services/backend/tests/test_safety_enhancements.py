@@ -97,3 +97,16 @@ def test_chat_blocks_jailbreak_attempt_early():
         or "coping" in coach_msg
     ), f"Expected a jailbreak blocking response, got: {payload['coach_message']!r}"
     assert payload.get("risk_level") in ("jailbreak", "out_of_scope")
+
+
+def test_assess_conversation_risk_reports_latest_risky_turn():
+    level, snippet = assess_conversation_risk(
+        [
+            {"role": "user", "content": "Can you prescribe medication for me?"},
+            {"role": "assistant", "content": "I can't help with prescriptions."},
+            {"role": "user", "content": "I want to end my life"},
+            {"role": "user", "content": "Can you suggest a breathing exercise?"},
+        ]
+    )
+    assert level == "crisis"
+    assert snippet == "I want to end my life"
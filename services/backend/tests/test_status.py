@@ -142,3 +142,17 @@ def test_pgvector_ready_true_when_extension_and_tables_exist():
     except OperationalError:
         pytest.skip("postgres not available for pgvector readiness check")
     assert db.pgvector_ready() is True
+
+
+def test_init_db_skips_ddl_once_schema_is_built(monkeypatch):
+    calls = {"count": 0}
+
+    def fake_create_all(*args, **kwargs):
+        calls["count"] += 1
+
+    monkeypatch.setattr(db, "_schema_ready", False)
+    monkeypatch.setattr(db.Base.metadata, "create_all", fake_create_all)
+
+    db.init_db()
+    db.init_db()
+    assert calls["count"] == 1
@@ -1,40 +1,10 @@
-import pytest
-from fastapi.testclient import TestClient
-
-from app import db
 from app.config import settings
-from app.main import app
-from app.models import PendingAction, User
 from app.schemas import TherapistResult
 
 
-def _reset_db():
-    db.reset_engine("sqlite+pysqlite:///./test_therapists.db")
-    db.init_db()
-    with db.SessionLocal() as session:
-        session.query(PendingAction).delete()
-        session.query(User).delete()
-        session.commit()
-
-
-@pytest.fixture()
-def test_db():
-    original_url = str(db.engine.url)
-    _reset_db()
-    yield
-    db.reset_engine(original_url)
-
-
-def test_therapist_search_requires_sign_in_when_unauthenticated(test_db):
-    # Premium gating is only enforced when dev_mode=False.
-    # Override the setting locally so this test verifies production behaviour.
-    original_dev_mode = settings.dev_mode
-    settings.dev_mode = False
-    try:
-        client = TestClient(app)
-        response = client.post("/chat", json={"message": "find therapist near Stockholm"})
-    finally:
-        settings.dev_mode = original_dev_mode
+def test_therapist_search_requires_sign_in_when_unauthenticated(db_session, client):
+    # Premium gating is only enforced when dev_mode=False, the conftest default.
+    response = client.post("/chat", json={"message": "find therapist near Stockholm"})
 
     assert response.status_code == 200
     payload = response.json()
@@ -44,22 +14,12 @@ def test_therapist_search_requires_sign_in_when_unauthenticated(test_db):
     assert payload.get("therapists") is None
 
 
-def test_therapist_search_requires_premium_for_authenticated_user(test_db):
-    with db.SessionLocal() as session:
-        user = User(email="free@example.com", name="Free User", is_premium=False)
-        session.add(user)
-        session.commit()
-        session.refresh(user)
+def test_therapist_search_requires_premium_for_authenticated_user(make_user, client):
+    user_id = make_user(email="free@example.com", name="Free User", is_premium=False)
 
-    # Premium gating is only enforced when dev_mode=False.
-    original_dev_mode = settings.dev_mode
-    settings.dev_mode = False
-    try:
-        client = TestClient(app)
-        client.cookies.set(settings.session_cookie_name, str(user.id))
-        response = client.post("/chat", json={"message": "find therapist in Stockholm"})
-    finally:
-        settings.dev_mode = original_dev_mode
+    # Premium gating is only enforced when dev_mode=False, the conftest default.
+    client.cookies.set(settings.session_cookie_name, user_id)
+    response = client.post("/chat", json={"message": "find therapist in Stockholm"})
 
     assert response.status_code == 200
     payload = response.json()
@@ -67,12 +27,8 @@ def test_therapist_search_requires_premium_for_authenticated_user(test_db):
     assert "premium" in payload["coach_message"].lower()
 
 
-def test_therapist_search_returns_results_for_premium(monkeypatch, test_db):
-    with db.SessionLocal() as session:
-        user = User(email="premium@example.com", name="Premium User", is_premium=True)
-        session.add(user)
-        session.commit()
-        session.refresh(user)
+def test_therapist_search_returns_results_for_premium(monkeypatch, make_user, client):
+    user_id = make_user(email="premium@example.com", name="Premium User", is_premium=True)
 
     called = {"count": 0}
 
@@ -95,8 +51,7 @@ def test_therapist_search_returns_results_for_premium(monkeypatch, test_db):
         ]
 
     monkeypatch.setattr("app.main._run_therapist_search", stub_search)
-    client = TestClient(app)
-    client.cookies.set(settings.session_cookie_name, str(user.id))
+    client.cookies.set(settings.session_cookie_name, user_id)
 
     response = client.post("/chat", json={"message": "find therapist in Stockholm"})
 
@@ -107,9 +62,7 @@ def test_therapist_search_returns_results_for_premium(monkeypatch, test_db):
     assert payload["therapists"][0]["name"] == "Stockholm Therapy"
 
 
-def test_prescription_request_does_not_trigger_paywall(test_db):
-    client = TestClient(app)
-
+def test_prescription_request_does_not_trigger_paywall(db_session, client):
     response = client.post("/chat", json={"message": "Can you prescribe medication?"})
 
     assert response.status_code == 200
@@ -121,12 +74,8 @@ def test_prescription_request_does_not_trigger_paywall(test_db):
     assert payload.get("premium_cta") is None
 
 
-def test_therapist_search_prompt_does_not_trigger_booking(monkeypatch, test_db):
-    with db.SessionLocal() as session:
-        user = User(email="premium2@example.com", name="Premium User 2", is_premium=True)
-        session.add(user)
-        session.commit()
-        session.refresh(user)
+def test_therapist_search_prompt_does_not_trigger_booking(monkeypatch, make_user, client):
+    user_id = make_user(email="premium2@example.com", name="Premium User 2", is_premium=True)
 
     calls = {"count": 0}
 
@@ -143,8 +92,7 @@ def test_therapist_search_prompt_does_not_trigger_booking(monkeypatch, test_db):
         ]
 
     monkeypatch.setattr("app.main.mcp_therapist_search", stub_search)
-    client = TestClient(app)
-    client.cookies.set(settings.session_cookie_name, str(user.id))
+    client.cookies.set(settings.session_cookie_name, user_id)
 
     response = client.post(
         "/chat",
@@ -159,12 +107,8 @@ def test_therapist_search_prompt_does_not_trigger_booking(monkeypatch, test_db):
     assert payload.get("requires_confirmation") is not True
 
 
-def test_therapist_search_prompt_with_specialty_uses_fallback(monkeypatch, test_db):
-    with db.SessionLocal() as session:
-        user = User(email="premium3@example.com", name="Premium User 3", is_premium=True)
-        session.add(user)
-        session.commit()
-        session.refresh(user)
+def test_therapist_search_prompt_with_specialty_uses_fallback(monkeypatch, make_user, client):
+    user_id = make_user(email="premium3@example.com", name="Premium User 3", is_premium=True)
 
     calls: list[dict[str, object]] = []
 
@@ -188,8 +132,7 @@ def test_therapist_search_prompt_with_specialty_uses_fallback(monkeypatch, test_
         ]
 
     monkeypatch.setattr("app.main._run_therapist_search", stub_search)
-    client = TestClient(app)
-    client.cookies.set(settings.session_cookie_name, str(user.id))
+    client.cookies.set(settings.session_cookie_name, user_id)
 
     response = client.post(
         "/chat",
@@ -207,19 +150,14 @@ def test_therapist_search_prompt_with_specialty_uses_fallback(monkeypatch, test_
     assert len(calls) == 2
 
 
-def test_booking_prompt_triggers_booking_proposal_not_therapist_search(monkeypatch, test_db):
-    with db.SessionLocal() as session:
-        user = User(email="booking@example.com", name="Booking User", is_premium=True)
-        session.add(user)
-        session.commit()
-        session.refresh(user)
+def test_booking_prompt_triggers_booking_proposal_not_therapist_search(monkeypatch, make_user, client):
+    user_id = make_user(email="booking@example.com", name="Booking User", is_premium=True)
 
     def fail_search(*args, **kwargs):
         raise AssertionError("therapist search should not run for booking prompt")
 
     monkeypatch.setattr("app.main._run_therapist_search", fail_search)
-    client = TestClient(app)
-    client.cookies.set(settings.session_cookie_name, str(user.id))
+    client.cookies.set(settings.session_cookie_name, user_id)
 
     response = client.post(
         "/chat",
@@ -1,32 +1,8 @@
 import pytest
 from fastapi import HTTPException
-from fastapi.testclient import TestClient
 
-from app import db, mcp_client
+from app import mcp_client
 from app.config import settings
-from app.main import app
-from app.models import User
-
-
-@pytest.fixture()
-def test_db():
-    original_url = str(db.engine.url)
-    db.reset_engine("sqlite+pysqlite:///./test_therapist_mcp.db")
-    db.init_db()
-    with db.SessionLocal() as session:
-        session.query(User).delete()
-        session.commit()
-    yield
-    db.reset_engine(original_url)
-
-
-def _create_user(*, is_premium: bool) -> User:
-    with db.SessionLocal() as session:
-        user = User(email=f"user-{is_premium}@example.com", name="User", is_premium=is_premium)
-        session.add(user)
-        session.commit()
-        session.refresh(user)
-        return user
 
 
 def test_mcp_therapist_search_success(monkeypatch):
@@ -109,10 +85,9 @@ def test_mcp_therapist_search_invalid_argument_error_payload(monkeypatch):
     assert "INVALID_ARGUMENT" in str(exc.value.detail)
 
 
-def test_therapists_route_mcp_timeout_returns_502(monkeypatch, test_db):
-    premium_user = _create_user(is_premium=True)
-    client = TestClient(app)
-    client.cookies.set(settings.session_cookie_name, str(premium_user.id))
+def test_therapists_route_mcp_timeout_returns_502(monkeypatch, make_user, client):
+    premium_user_id = make_user(email="premium@example.com", name="Premium User", is_premium=True)
+    client.cookies.set(settings.session_cookie_name, premium_user_id)
 
     async def timeout_tool(*args, **kwargs):
         raise mcp_client.httpx.ReadTimeout("timeout")
@@ -125,25 +100,18 @@ def test_therapists_route_mcp_timeout_returns_502(monkeypatch, test_db):
     assert "timed out" in response.json()["detail"].lower()
 
 
-def test_premium_gating_therapist_search(test_db):
-    free_user = _create_user(is_premium=False)
-    # Premium gating is only enforced when dev_mode=False.
-    original_dev_mode = settings.dev_mode
-    settings.dev_mode = False
-    try:
-        client = TestClient(app)
-        client.cookies.set(settings.session_cookie_name, str(free_user.id))
-        response = client.post("/therapists/search", json={"location": "Stockholm"})
-    finally:
-        settings.dev_mode = original_dev_mode
+def test_premium_gating_therapist_search(make_user, client):
+    free_user_id = make_user(email="free@example.com", name="Free User", is_premium=False)
+    # Premium gating is only enforced when dev_mode=False, the conftest default.
+    client.cookies.set(settings.session_cookie_name, free_user_id)
+    response = client.post("/therapists/search", json={"location": "Stockholm"})
 
     assert response.status_code == 403
 
 
-def test_therapists_route_accepts_location_text_alias(monkeypatch, test_db):
-    premium_user = _create_user(is_premium=True)
-    client = TestClient(app)
-    client.cookies.set(settings.session_cookie_name, str(premium_user.id))
+def test_therapists_route_accepts_location_text_alias(monkeypatch, make_user, client):
+    premium_user_id = make_user(email="premium@example.com", name="Premium User", is_premium=True)
+    client.cookies.set(settings.session_cookie_name, premium_user_id)
 
     monkeypatch.setattr(
         "app.main._run_therapist_search",
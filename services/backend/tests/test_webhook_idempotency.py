@@ -3,6 +3,7 @@ import json
 import pytest
 import stripe
 from fastapi.testclient import TestClient
+from sqlalchemy import delete
 
 from app import db
 from app.config import settings
@@ -12,15 +13,10 @@ from app.models import StripeEvent, User
 
 @pytest.fixture()
 def test_db():
-    original_url = str(db.engine.url)
-    db.reset_engine("sqlite+pysqlite:///./test_payments.db")
-    db.init_db()
     with db.SessionLocal() as session:
-        session.query(StripeEvent).delete()
-        session.query(User).delete()
+        session.execute(delete(StripeEvent))
+        session.execute(delete(User))
         session.commit()
-    yield
-    db.reset_engine(original_url)
 
 
 def test_webhook_idempotency(test_db, monkeypatch):
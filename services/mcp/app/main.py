@@ -9,7 +9,7 @@ from starlette.responses import JSONResponse, Response
 from starlette.routing import Mount, Route
 
 from .send_email import send_email_via_smtp
-from .therapist_search import therapist_search
+from .therapist_search import therapist_search_async
 
 
 mcp = FastMCP(
@@ -21,7 +21,7 @@ mcp = FastMCP(
 
 
 @mcp.tool()
-def therapist_search_tool(
+async def therapist_search_tool(
     location_text: str,
     radius_km: float = 5,
     specialty: str | None = None,
@@ -30,7 +30,7 @@ def therapist_search_tool(
     normalized_specialty = specialty.strip() if isinstance(specialty, str) else None
     if normalized_specialty == "":
         normalized_specialty = None
-    return therapist_search(
+    return await therapist_search_async(
         location_text=location_text,
         radius_km=max(1.0, min(radius_km, 50.0)),
         specialty=normalized_specialty,
@@ -1,15 +1,142 @@
 from __future__ import annotations
 
+import functools
+import heapq
 import math
+import random
+import re
+import threading
 import time
-from typing import Any
+import unicodedata
+from collections import OrderedDict
+from string import Template
+from typing import Any, Generic, Hashable, TypeVar
 
+import anyio
 import httpx
+from pydantic_core import from_json
 
 
 GEOCODE_TIMEOUT = httpx.Timeout(8.0, connect=4.0)
 OVERPASS_TIMEOUT = httpx.Timeout(20.0, connect=5.0)
 RETRY_DELAYS = [0.4, 0.8]
+OVERPASS_TEMPORARY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+# The breaker opens only after this many consecutive failures, so a single
+# transient 5xx does not cut off every search for the cool-off window.
+OVERPASS_BREAKER_FAILURE_THRESHOLD = 3
+OVERPASS_BREAKER_MAX_COOLDOWN_SECONDS = 60.0
+
+GEOCODE_CACHE_TTL_SECONDS = 24 * 60 * 60
+OVERPASS_CACHE_TTL_SECONDS = 15 * 60
+CACHE_MAX_ENTRIES = 1024
+# Overpass lookups are keyed on coordinates rounded to ~100 m so that nearby
+# geocodes ("Berlin Mitte" / "Berlin-Mitte") share one upstream query.
+OVERPASS_COORD_PRECISION = 3
+
+_V = TypeVar("_V")
+
+
+# Bounded LRU whose entries also expire after a fixed TTL. Expiry is checked
+# lazily on lookup and the least recently used entry is evicted on insert, so
+# both stay O(1) and no background purge is needed.
+class _TTLCache(Generic[_V]):
+    def __init__(self, maxsize: int, ttl_seconds: float) -> None:
+        self._maxsize = maxsize
+        self._ttl = ttl_seconds
+        self._data: OrderedDict[Hashable, tuple[float, _V]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> _V | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: _V) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self._ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# Geocodes and Overpass results are cached separately: changing the radius or
+# specialty reuses the (slow, rate-limited) Nominatim lookup, and addresses
+# change far less often than the provider listings around them.
+_GEOCODE_CACHE: _TTLCache[tuple[float, float]] = _TTLCache(
+    maxsize=CACHE_MAX_ENTRIES,
+    ttl_seconds=GEOCODE_CACHE_TTL_SECONDS,
+)
+_OVERPASS_CACHE: _TTLCache[list[dict[str, Any]]] = _TTLCache(
+    maxsize=CACHE_MAX_ENTRIES,
+    ttl_seconds=OVERPASS_CACHE_TTL_SECONDS,
+)
+
+# The public Nominatim instance allows at most one request per second.
+PUBLIC_NOMINATIM_HOST = "nominatim.openstreetmap.org"
+NOMINATIM_REQUESTS_PER_SECOND = 1.0
+
+
+# Token bucket: refills continuously from the monotonic clock, so admitting a
+# request is O(1) arithmetic with no per-request history to trim. acquire()
+# waits for the next token rather than failing, smoothing bursts to the rate.
+# The token is reserved under the lock (the balance may go negative) and the
+# wait happens after releasing it, so one throttled caller never blocks others
+# from reserving their own slot.
+class _TokenBucket:
+    def __init__(self, rate_per_second: float, capacity: float) -> None:
+        self._rate = rate_per_second
+        self._capacity = capacity
+        self._tokens = capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self._capacity, self._tokens + (now - self._last) * self._rate)
+        self._last = now
+
+    def acquire(self) -> None:
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= 1.0
+            wait = -self._tokens / self._rate
+        if wait > 0:
+            time.sleep(wait)
+
+
+_NOMINATIM_BUCKET = _TokenBucket(rate_per_second=NOMINATIM_REQUESTS_PER_SECOND, capacity=1.0)
+
+# Shared connection pool so repeated Nominatim/Overpass calls reuse TCP and TLS
+# sessions instead of opening a fresh connection for every request.
+_HTTP_CLIENT = httpx.Client(limits=httpx.Limits(max_connections=20, max_keepalive_connections=10))
+
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_SEPARATOR_RE = re.compile(r"\s*[,.;]+\s*")
+
+
+# Cache key for a free-text location. Nominatim already ignores case, spacing
+# and separator punctuation, so "New  York", "new york" and "New York." all
+# resolve to the same place and can share one cached geocode. The original
+# text is still what gets sent upstream.
+def _geocode_cache_key(location_text: str) -> str:
+    key = unicodedata.normalize("NFKC", location_text).casefold()
+    key = _SEPARATOR_RE.sub(", ", key)
+    key = _WHITESPACE_RE.sub(" ", key)
+    return key.strip(" ,")
 
 
 def _nominatim_endpoint(base_url: str) -> str:
@@ -26,11 +153,18 @@ def _overpass_endpoint(base_url: str) -> str:
     return f"{base}/api/interpreter"
 
 
-def _retry_request_get(url: str, params: dict[str, Any], headers: dict[str, str]) -> httpx.Response:
+def _retry_request_get(
+    url: str,
+    params: dict[str, Any],
+    headers: dict[str, str],
+    throttle: _TokenBucket | None = None,
+) -> httpx.Response:
     last_error: Exception | None = None
     for attempt in range(len(RETRY_DELAYS) + 1):
         try:
-            response = httpx.get(url, params=params, headers=headers, timeout=GEOCODE_TIMEOUT)
+            if throttle is not None:
+                throttle.acquire()
+            response = _HTTP_CLIENT.get(url, params=params, headers=headers, timeout=GEOCODE_TIMEOUT)
             response.raise_for_status()
             return response
         except (httpx.TimeoutException, httpx.ConnectError, httpx.ReadError) as exc:
@@ -42,25 +176,83 @@ def _retry_request_get(url: str, params: dict[str, Any], headers: dict[str, str]
     raise RuntimeError("Unexpected geocoding retry failure.") from last_error
 
 
+class OverpassUnavailableError(RuntimeError):
+    pass
+
+
+# Per-endpoint circuit breaker. It opens once failure_threshold consecutive
+# calls have failed; every further failure doubles the cool-off (capped), and
+# while it is open calls fail immediately instead of queueing more load on an
+# Overpass instance that is already throttling or down.
+class _CircuitBreaker:
+    def __init__(self, failure_threshold: int, max_cooldown_seconds: float) -> None:
+        self._failure_threshold = failure_threshold
+        self._max_cooldown = max_cooldown_seconds
+        self._failures = 0
+        self._open_until = 0.0
+        self._lock = threading.Lock()
+
+    def check(self) -> None:
+        with self._lock:
+            if time.monotonic() < self._open_until:
+                raise OverpassUnavailableError("Overpass is cooling off after repeated failures.")
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._open_until = 0.0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._failures < self._failure_threshold:
+                return
+            trips = self._failures - self._failure_threshold + 1
+            cooldown = min(self._max_cooldown, 2.0 ** trips)
+            self._open_until = time.monotonic() + cooldown
+
+
+_OVERPASS_BREAKERS: dict[str, _CircuitBreaker] = {}
+_OVERPASS_BREAKERS_LOCK = threading.Lock()
+
+
+def _overpass_breaker(url: str) -> _CircuitBreaker:
+    with _OVERPASS_BREAKERS_LOCK:
+        breaker = _OVERPASS_BREAKERS.get(url)
+        if breaker is None:
+            breaker = _CircuitBreaker(
+                OVERPASS_BREAKER_FAILURE_THRESHOLD,
+                OVERPASS_BREAKER_MAX_COOLDOWN_SECONDS,
+            )
+            _OVERPASS_BREAKERS[url] = breaker
+        return breaker
+
+
 def _retry_request_post(url: str, content: str, headers: dict[str, str]) -> httpx.Response:
+    breaker = _overpass_breaker(url)
+    breaker.check()
     last_error: Exception | None = None
     for attempt in range(len(RETRY_DELAYS) + 1):
         try:
-            response = httpx.post(url, content=content, headers=headers, timeout=OVERPASS_TIMEOUT)
-            if response.status_code in {429, 500, 502, 503, 504}:
-                raise httpx.HTTPStatusError(
-                    "upstream temporary error",
-                    request=response.request,
-                    response=response
-                )
-            response.raise_for_status()
-            return response
-        except (httpx.TimeoutException, httpx.ConnectError, httpx.ReadError, httpx.HTTPStatusError) as exc:
+            response = _HTTP_CLIENT.post(url, content=content, headers=headers, timeout=OVERPASS_TIMEOUT)
+        except (httpx.TimeoutException, httpx.ConnectError, httpx.ReadError) as exc:
             last_error = exc
             if attempt < len(RETRY_DELAYS):
-                time.sleep(RETRY_DELAYS[attempt])
+                # Jitter keeps concurrent searches from retrying in lockstep.
+                time.sleep(RETRY_DELAYS[attempt] * random.uniform(0.5, 1.5))
                 continue
+            breaker.record_failure()
             raise
+        if response.status_code in OVERPASS_TEMPORARY_STATUS_CODES:
+            # Overpass is shedding load: fail fast and let the breaker back off
+            # rather than sleeping on the request thread and retrying into it.
+            breaker.record_failure()
+            raise OverpassUnavailableError(
+                f"Overpass returned {response.status_code}."
+            )
+        response.raise_for_status()
+        breaker.record_success()
+        return response
     raise RuntimeError("Unexpected overpass retry failure.") from last_error
 
 
@@ -71,10 +263,12 @@ def geocode_location(
 ) -> tuple[float, float] | None:
     if not location_text.strip():
         return None
+    endpoint = _nominatim_endpoint(nominatim_base_url)
     response = _retry_request_get(
-        _nominatim_endpoint(nominatim_base_url),
+        endpoint,
         params={"q": location_text, "format": "json", "limit": 1},
         headers={"User-Agent": user_agent, "Accept": "application/json"},
+        throttle=_NOMINATIM_BUCKET if httpx.URL(endpoint).host == PUBLIC_NOMINATIM_HOST else None,
     )
     payload = response.json()
     if not isinstance(payload, list) or not payload:
@@ -87,28 +281,20 @@ def geocode_location(
     return lat, lon
 
 
+# node/way/relation are folded into `nwr` and the four healthcare tags into
+# one anchored regex, so Overpass runs two filters instead of fifteen.
+_OVERPASS_QUERY_TEMPLATE = Template(
+    "[out:json][timeout:25];"
+    "("
+    'nwr["healthcare"~"^(psychotherapist|psychologist|psychiatrist|counselling)$$"](around:$radius,$lat,$lon);'
+    'nwr["amenity"="clinic"]["healthcare:speciality"~"psych|psychiatry|psychotherapy",i](around:$radius,$lat,$lon);'
+    ");"
+    "out center tags;"
+)
+
+
 def _build_overpass_query(lat: float, lon: float, radius_m: int) -> str:
-    return f"""
-    [out:json][timeout:25];
-    (
-      node["healthcare"="psychotherapist"](around:{radius_m},{lat},{lon});
-      way["healthcare"="psychotherapist"](around:{radius_m},{lat},{lon});
-      relation["healthcare"="psychotherapist"](around:{radius_m},{lat},{lon});
-      node["healthcare"="psychologist"](around:{radius_m},{lat},{lon});
-      way["healthcare"="psychologist"](around:{radius_m},{lat},{lon});
-      relation["healthcare"="psychologist"](around:{radius_m},{lat},{lon});
-      node["healthcare"="psychiatrist"](around:{radius_m},{lat},{lon});
-      way["healthcare"="psychiatrist"](around:{radius_m},{lat},{lon});
-      relation["healthcare"="psychiatrist"](around:{radius_m},{lat},{lon});
-      node["healthcare"="counselling"](around:{radius_m},{lat},{lon});
-      way["healthcare"="counselling"](around:{radius_m},{lat},{lon});
-      relation["healthcare"="counselling"](around:{radius_m},{lat},{lon});
-      node["amenity"="clinic"]["healthcare:speciality"~"psych|psychiatry|psychotherapy",i](around:{radius_m},{lat},{lon});
-      way["amenity"="clinic"]["healthcare:speciality"~"psych|psychiatry|psychotherapy",i](around:{radius_m},{lat},{lon});
-      relation["amenity"="clinic"]["healthcare:speciality"~"psych|psychiatry|psychotherapy",i](around:{radius_m},{lat},{lon});
-    );
-    out center tags;
-    """
+    return _OVERPASS_QUERY_TEMPLATE.substitute(radius=radius_m, lat=lat, lon=lon)
 
 
 def overpass_search(
@@ -124,7 +310,9 @@ def overpass_search(
         content=query,
         headers={"User-Agent": user_agent, "Accept": "application/json"},
     )
-    payload = response.json()
+    # Overpass payloads run to thousands of elements; pydantic-core's Rust
+    # parser decodes the raw bytes noticeably faster than the stdlib json module.
+    payload = from_json(response.content)
     if not isinstance(payload, dict):
         return []
     elements = payload.get("elements")
@@ -148,13 +336,7 @@ def _format_address(tags: dict[str, Any]) -> str:
     return ", ".join(parts) if parts else "Address unavailable"
 
 
-def _haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-    radius = 6371.0
-    phi1, phi2 = math.radians(lat1), math.radians(lat2)
-    delta_phi = math.radians(lat2 - lat1)
-    delta_lambda = math.radians(lon2 - lon1)
-    a = math.sin(delta_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(delta_lambda / 2) ** 2
-    return radius * (2 * math.atan2(math.sqrt(a), math.sqrt(1 - a)))
+EARTH_RADIUS_KM = 6371.0
 
 
 def _matches_specialty(tags: dict[str, Any], specialty: str | None) -> bool:
@@ -172,12 +354,23 @@ def normalize_results(
     limit: int
 ) -> list[dict[str, Any]]:
     normalized: list[dict[str, Any]] = []
+    # Equirectangular approximation: within the 50 km search cap it agrees with
+    # the haversine to under a metre when the longitude scale uses the mean
+    # latitude, at the cost of one cosine per element instead of four trig
+    # calls plus atan2.
+    km_per_degree = math.radians(1.0) * EARTH_RADIUS_KM
     for element in elements:
-        lat = element.get("lat") or element.get("center", {}).get("lat")
-        lon = element.get("lon") or element.get("center", {}).get("lon")
+        lat = element.get("lat")
+        lon = element.get("lon")
         if lat is None or lon is None:
-            continue
-        tags = element.get("tags") if isinstance(element.get("tags"), dict) else {}
+            center = element.get("center") or {}
+            lat = lat or center.get("lat")
+            lon = lon or center.get("lon")
+            if lat is None or lon is None:
+                continue
+        tags = element.get("tags")
+        if not isinstance(tags, dict):
+            tags = {}
         if not _matches_specialty(tags, specialty):
             continue
         name = str(tags.get("name") or tags.get("brand") or "Therapist")
@@ -190,7 +383,10 @@ def normalize_results(
         source_url = website
         if not source_url and osm_type and osm_id:
             source_url = f"https://www.openstreetmap.org/{osm_type}/{osm_id}"
-        distance_km = _haversine_km(origin_lat, origin_lon, float(lat), float(lon))
+        lat_value = float(lat)
+        dy = (lat_value - origin_lat) * km_per_degree
+        dx = (float(lon) - origin_lon) * km_per_degree * math.cos(math.radians((origin_lat + lat_value) / 2))
+        distance_km = math.hypot(dx, dy)
         normalized.append(
             {
                 "name": name,
@@ -201,10 +397,13 @@ def normalize_results(
                 "source_url": str(source_url) if source_url else None
             }
         )
-    normalized.sort(
+    # Only the nearest `limit` results are returned, so select them with a
+    # bounded heap instead of sorting every Overpass element.
+    return heapq.nsmallest(
+        limit,
+        normalized,
         key=lambda item: item["distance_km"] if item["distance_km"] is not None else 10_000.0
     )
-    return normalized[:limit]
 
 
 def therapist_search(
@@ -221,21 +420,31 @@ def therapist_search(
     if normalized_specialty == "":
         normalized_specialty = None
 
-    coords = geocode_location(
-        location_text=location_text,
-        nominatim_base_url=nominatim_base_url,
-        user_agent=user_agent
-    )
-    if not coords:
-        return []
+    geocode_key = (nominatim_base_url, _geocode_cache_key(location_text))
+    coords = _GEOCODE_CACHE.get(geocode_key)
+    if coords is None:
+        coords = geocode_location(
+            location_text=location_text,
+            nominatim_base_url=nominatim_base_url,
+            user_agent=user_agent
+        )
+        if not coords:
+            return []
+        _GEOCODE_CACHE.set(geocode_key, coords)
     lat, lon = coords
-    elements = overpass_search(
-        lat=lat,
-        lon=lon,
-        radius_km=radius_km,
-        overpass_base_url=overpass_base_url,
-        user_agent=user_agent
-    )
+    grid_lat = round(lat, OVERPASS_COORD_PRECISION)
+    grid_lon = round(lon, OVERPASS_COORD_PRECISION)
+    overpass_key = (overpass_base_url, grid_lat, grid_lon, int(radius_km * 1000))
+    elements = _OVERPASS_CACHE.get(overpass_key)
+    if elements is None:
+        elements = overpass_search(
+            lat=grid_lat,
+            lon=grid_lon,
+            radius_km=radius_km,
+            overpass_base_url=overpass_base_url,
+            user_agent=user_agent
+        )
+        _OVERPASS_CACHE.set(overpass_key, elements)
     return normalize_results(
         elements=elements,
         origin_lat=lat,
@@ -243,3 +452,30 @@ def therapist_search(
         specialty=normalized_specialty,
         limit=limit
     )
+
+
+async def therapist_search_async(
+    *,
+    location_text: str,
+    radius_km: float,
+    specialty: str | None,
+    limit: int,
+    nominatim_base_url: str,
+    overpass_base_url: str,
+    user_agent: str,
+) -> list[dict[str, Any]]:
+    # The geocode -> Overpass chain is blocking I/O; run it on a worker thread so
+    # the server's event loop keeps serving other sessions meanwhile. Concurrent
+    # searches overlap on separate threads and share the pooled HTTP client.
+    return await anyio.to_thread.run_sync(
+        functools.partial(
+            therapist_search,
+            location_text=location_text,
+            radius_km=radius_km,
+            specialty=specialty,
+            limit=limit,
+            nominatim_base_url=nominatim_base_url,
+            overpass_base_url=overpass_base_url,
+            user_agent=user_agent,
+        )
+    )
@@ -0,0 +1,288 @@
+import asyncio
+import math
+
+import httpx
+import pytest
+
+from app import therapist_search as search_module
+from app.therapist_search import (
+    OverpassUnavailableError,
+    _build_overpass_query,
+    normalize_results,
+    therapist_search,
+    therapist_search_async,
+)
+
+
+@pytest.fixture(autouse=True)
+def _clear_search_cache():
+    search_module._GEOCODE_CACHE.clear()
+    search_module._OVERPASS_CACHE.clear()
+    search_module._OVERPASS_BREAKERS.clear()
+    yield
+    search_module._GEOCODE_CACHE.clear()
+    search_module._OVERPASS_CACHE.clear()
+    search_module._OVERPASS_BREAKERS.clear()
+
+
+def _element(osm_id: int, lat: float, lon: float, **tags: str) -> dict:
+    return {
+        "type": "node",
+        "id": osm_id,
+        "lat": lat,
+        "lon": lon,
+        "tags": {"name": f"Clinic {osm_id}", **tags},
+    }
+
+
+def test_normalize_results_returns_nearest_first_up_to_limit():
+    elements = [
+        _element(1, 59.40, 18.07),
+        _element(2, 59.33, 18.07),
+        _element(3, 59.35, 18.07),
+        _element(4, 59.50, 18.07),
+    ]
+
+    results = normalize_results(elements, 59.33, 18.07, specialty=None, limit=2)
+
+    assert [item["name"] for item in results] == ["Clinic 2", "Clinic 3"]
+    assert results[0]["distance_km"] == 0.0
+    assert results[0]["source_url"] == "https://www.openstreetmap.org/node/2"
+
+
+def test_normalize_results_filters_by_specialty_and_skips_missing_coordinates():
+    elements = [
+        _element(1, 59.34, 18.07, **{"healthcare:speciality": "psychotherapy"}),
+        _element(2, 59.33, 18.07, **{"healthcare:speciality": "dentistry"}),
+        {"type": "way", "id": 3, "tags": {"name": "No coordinates"}},
+    ]
+
+    results = normalize_results(elements, 59.33, 18.07, specialty="psychotherapy", limit=5)
+
+    assert [item["name"] for item in results] == ["Clinic 1"]
+
+
+def _mock_upstream(monkeypatch, calls: list[str]) -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.method)
+        if request.method == "GET":
+            return httpx.Response(200, json=[{"lat": "59.33", "lon": "18.07"}])
+        return httpx.Response(200, json={"elements": [_element(1, 59.34, 18.07)]})
+
+    monkeypatch.setattr(
+        search_module,
+        "_HTTP_CLIENT",
+        httpx.Client(transport=httpx.MockTransport(handler)),
+    )
+
+
+def test_therapist_search_uses_shared_http_client(monkeypatch):
+    calls: list[str] = []
+    _mock_upstream(monkeypatch, calls)
+
+    results = therapist_search(
+        location_text="Stockholm",
+        radius_km=5,
+        specialty=None,
+        limit=5,
+        nominatim_base_url="https://nominatim.example",
+        overpass_base_url="https://overpass.example",
+        user_agent="tests",
+    )
+
+    assert [item["name"] for item in results] == ["Clinic 1"]
+    assert calls == ["GET", "POST"]
+
+
+def test_therapist_search_async_matches_sync_results(monkeypatch):
+    calls: list[str] = []
+    _mock_upstream(monkeypatch, calls)
+
+    results = asyncio.run(
+        therapist_search_async(
+            location_text="Stockholm",
+            radius_km=5,
+            specialty=None,
+            limit=5,
+            nominatim_base_url="https://nominatim.example",
+            overpass_base_url="https://overpass.example",
+            user_agent="tests",
+        )
+    )
+
+    assert [item["name"] for item in results] == ["Clinic 1"]
+    assert calls == ["GET", "POST"]
+
+
+def _search(**overrides):
+    params = {
+        "location_text": "Stockholm",
+        "radius_km": 5,
+        "specialty": None,
+        "limit": 5,
+        "nominatim_base_url": "https://nominatim.example",
+        "overpass_base_url": "https://overpass.example",
+        "user_agent": "tests",
+    }
+    params.update(overrides)
+    return therapist_search(**params)
+
+
+def test_therapist_search_serves_repeat_queries_from_cache(monkeypatch):
+    calls: list[str] = []
+    _mock_upstream(monkeypatch, calls)
+
+    first = _search()
+    first[0]["name"] = "mutated by caller"
+    second = _search()
+
+    assert [item["name"] for item in second] == ["Clinic 1"]
+    assert calls == ["GET", "POST"]
+
+
+def test_changing_radius_reuses_cached_geocode(monkeypatch):
+    calls: list[str] = []
+    _mock_upstream(monkeypatch, calls)
+
+    _search(radius_km=5)
+    _search(radius_km=10)
+    _search(radius_km=10, specialty="psychotherapy")
+
+    assert calls == ["GET", "POST", "POST"]
+
+
+def test_location_variants_share_cached_geocode(monkeypatch):
+    calls: list[str] = []
+    _mock_upstream(monkeypatch, calls)
+
+    _search(location_text="New York, NY")
+    _search(location_text="  new  york ,ny ")
+    _search(location_text="ＮＥＷ ＹＯＲＫ; NY.")
+
+    assert calls == ["GET", "POST"]
+
+
+def test_search_cache_expires_and_evicts_least_recently_used(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(search_module.time, "monotonic", lambda: now[0])
+    cache = search_module._TTLCache(maxsize=2, ttl_seconds=10)
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)  # evicts "b", the least recently used entry
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+
+    now[0] += 10
+    assert cache.get("a") is None
+    assert cache.get("c") is None
+
+
+def test_overpass_query_uses_combined_nwr_filters():
+    query = _build_overpass_query(59.33, 18.07, 5000)
+
+    assert query.count("nwr[") == 2
+    assert '"^(psychotherapist|psychologist|psychiatrist|counselling)$"' in query
+    assert "(around:5000,59.33,18.07)" in query
+    assert query.endswith("out center tags;")
+
+
+def test_normalize_results_distance_matches_haversine_within_search_radius():
+    origin_lat, origin_lon = 59.3293, 18.0686
+    target_lat, target_lon = 59.6, 18.6
+
+    phi0, phi1 = math.radians(origin_lat), math.radians(target_lat)
+    a = (
+        math.sin((phi1 - phi0) / 2) ** 2
+        + math.cos(phi0) * math.cos(phi1) * math.sin(math.radians(target_lon - origin_lon) / 2) ** 2
+    )
+    haversine_km = 6371.0 * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+    results = normalize_results([_element(1, target_lat, target_lon)], origin_lat, origin_lon, None, 1)
+
+    assert abs(results[0]["distance_km"] - haversine_km) < 0.01
+
+
+def test_nominatim_token_bucket_spaces_requests(monkeypatch):
+    now = [50.0]
+    sleeps: list[float] = []
+
+    def fake_sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    monkeypatch.setattr(search_module.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(search_module.time, "sleep", fake_sleep)
+    bucket = search_module._TokenBucket(rate_per_second=1.0, capacity=1.0)
+
+    bucket.acquire()
+    assert sleeps == []
+    now[0] += 0.25
+    bucket.acquire()
+    assert sleeps == [0.75]
+    now[0] += 5
+    bucket.acquire()  # refilled, capped at capacity
+    assert sleeps == [0.75]
+
+
+def test_nominatim_token_bucket_waits_outside_the_lock(monkeypatch):
+    sleeps: list[float] = []
+
+    def fake_sleep(seconds: float) -> None:
+        # Other callers can reserve their own slot while this one waits.
+        assert not bucket._lock.locked()
+        sleeps.append(seconds)
+
+    monkeypatch.setattr(search_module.time, "monotonic", lambda: 50.0)
+    monkeypatch.setattr(search_module.time, "sleep", fake_sleep)
+    bucket = search_module._TokenBucket(rate_per_second=1.0, capacity=1.0)
+
+    bucket.acquire()
+    bucket.acquire()
+    bucket.acquire()
+
+    # Back-to-back callers queue up one interval apart.
+    assert sleeps == [1.0, 2.0]
+
+
+def test_overpass_overload_fails_fast_and_opens_circuit_after_threshold(monkeypatch):
+    now = [1000.0]
+    sleeps: list[float] = []
+    threshold = search_module.OVERPASS_BREAKER_FAILURE_THRESHOLD
+    statuses = [503] * threshold + [200]
+    calls: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.method)
+        if request.method == "GET":
+            return httpx.Response(200, json=[{"lat": "59.33", "lon": "18.07"}])
+        status = statuses.pop(0)
+        if status != 200:
+            return httpx.Response(status)
+        return httpx.Response(200, json={"elements": [_element(1, 59.34, 18.07)]})
+
+    monkeypatch.setattr(
+        search_module,
+        "_HTTP_CLIENT",
+        httpx.Client(transport=httpx.MockTransport(handler)),
+    )
+    monkeypatch.setattr(search_module.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(search_module.time, "sleep", sleeps.append)
+
+    # Each overload is reported straight away, but the breaker stays closed
+    # until the threshold is reached.
+    for attempt in range(1, threshold + 1):
+        with pytest.raises(OverpassUnavailableError):
+            _search()
+        assert calls == ["GET"] + ["POST"] * attempt
+    assert sleeps == []
+
+    with pytest.raises(OverpassUnavailableError):
+        _search()
+    assert calls == ["GET"] + ["POST"] * threshold
+
+    now[0] += 2.0
+    results = _search()
+    assert [item["name"] for item in results] == ["Clinic 1"]
+    assert calls == ["GET"] + ["POST"] * (threshold + 1)
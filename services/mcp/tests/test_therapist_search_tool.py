@@ -1,12 +1,17 @@
+import asyncio
+
+import pytest
 from fastapi.testclient import TestClient
+from mcp.server.fastmcp.exceptions import ToolError
 
-from app.main import app
+from app.main import app, mcp
+from app.therapist_search import OverpassUnavailableError
 
 
 def test_therapist_search_tool_success(monkeypatch):
     captured: dict[str, object] = {}
 
-    def stub_search(**kwargs):
+    async def stub_search(**kwargs):
         captured.update(kwargs)
         return [
             {
@@ -20,7 +25,7 @@ def test_therapist_search_tool_success(monkeypatch):
         ]
 
     monkeypatch.setattr(
-        "app.main.therapist_search",
+        "app.main.therapist_search_async",
         stub_search
     )
     client = TestClient(app)
@@ -40,7 +45,7 @@ def test_therapist_search_tool_success(monkeypatch):
 def test_therapist_search_tool_allows_empty_specialty(monkeypatch):
     captured: dict[str, object] = {}
 
-    def stub_search(**kwargs):
+    async def stub_search(**kwargs):
         captured.update(kwargs)
         return [
             {
@@ -53,7 +58,7 @@ def test_therapist_search_tool_allows_empty_specialty(monkeypatch):
             }
         ]
 
-    monkeypatch.setattr("app.main.therapist_search", stub_search)
+    monkeypatch.setattr("app.main.therapist_search_async", stub_search)
     client = TestClient(app)
 
     response = client.post(
@@ -86,7 +91,7 @@ def test_therapist_search_tool_allows_empty_specialty(monkeypatch):
 def test_therapist_search_tool_with_specialty(monkeypatch):
     captured: dict[str, object] = {}
 
-    def stub_search(**kwargs):
+    async def stub_search(**kwargs):
         captured.update(kwargs)
         return [
             {
@@ -99,7 +104,7 @@ def test_therapist_search_tool_with_specialty(monkeypatch):
             }
         ]
 
-    monkeypatch.setattr("app.main.therapist_search", stub_search)
+    monkeypatch.setattr("app.main.therapist_search_async", stub_search)
     client = TestClient(app)
 
     response = client.post(
@@ -124,6 +129,18 @@ def test_therapist_search_tool_invalid_argument():
     assert payload["error"]["code"] == "INVALID_ARGUMENT"
 
 
+def test_therapist_search_tool_reports_overpass_outage_as_error(monkeypatch):
+    # An Overpass outage surfaces as a tool error rather than an empty result,
+    # so the backend does not tell the user there are no therapists nearby.
+    async def stub_search(**kwargs):
+        raise OverpassUnavailableError("Overpass returned 503.")
+
+    monkeypatch.setattr("app.main.therapist_search_async", stub_search)
+
+    with pytest.raises(ToolError, match="Overpass returned 503"):
+        asyncio.run(mcp.call_tool("therapist_search_tool", {"location_text": "Stockholm"}))
+
+
 def test_send_email_success(monkeypatch):
     monkeypatch.setattr("app.main.send_email_via_smtp", lambda **kwargs: "<msg-1@example.com>")
     client = TestClient(app)